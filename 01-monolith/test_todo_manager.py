@@ -0,0 +1,495 @@
+"""
+Test Suite for the Monolithic Todo Manager (Test-Driven Development)
+===================================================================
+
+These tests define the requirements for todo_manager.py. They live in their
+own module so that importing todo_manager doesn't pull in unittest.
+
+Run them with:
+    python3 test_todo_manager.py
+"""
+
+import unittest
+import sys
+
+from todo_manager import (
+    tasks,
+    add_task,
+    add_tasks,
+    list_all_tasks,
+    list_pending_high_priority,
+    count_completed_tasks,
+    mark_task_done,
+    remove_task,
+    get_task_by_id,
+    clear_all_tasks,
+)
+
+
+# --- Test Suite ---
+class TestTodoManager(unittest.TestCase):
+    """
+    Test suite that defines the requirements for our monolithic todo manager.
+
+    These tests serve as:
+    1. Requirements specification
+    2. Design documentation
+    3. Acceptance criteria
+    4. Regression protection
+
+    Read these tests carefully - they tell you exactly what to implement!
+    """
+
+    def setUp(self):
+        """Set up clean state before each test."""
+        clear_all_tasks()
+
+    def test_clear_all_tasks(self):
+        """Test that we can clear all tasks (needed for test isolation)."""
+        # First add some tasks
+        add_task("Test task", 1)
+        add_task("Another task", 2)
+
+        # Then clear them
+        clear_all_tasks()
+
+        # Should have no tasks
+        self.assertEqual(len(tasks), 0)
+
+    def test_add_task_creates_correct_structure(self):
+        """Test that add_task creates a task with the correct structure."""
+        result = add_task("Buy groceries", 2)
+
+        # Should return a success message
+        self.assertEqual(result, "Task 1 added.")
+
+        # Should add exactly one task
+        self.assertEqual(len(tasks), 1)
+
+        # Task should have correct structure
+        task = tasks[0]
+        self.assertIn("id", task)
+        self.assertIn("description", task)
+        self.assertIn("priority", task)
+        self.assertIn("completed", task)
+
+        # Task should have correct values
+        self.assertEqual(task["description"], "Buy groceries")
+        self.assertEqual(task["priority"], 2)
+        self.assertEqual(task["completed"], False)
+        self.assertIsInstance(task["id"], int)
+        self.assertGreater(task["id"], 0)
+
+    def test_add_task_generates_unique_ids(self):
+        """Test that add_task generates unique, sequential IDs."""
+        add_task("First task", 1)
+        add_task("Second task", 2)
+        add_task("Third task", 3)
+
+        # Should have 3 tasks
+        self.assertEqual(len(tasks), 3)
+
+        # IDs should be unique and sequential
+        ids = [task["id"] for task in tasks]
+        self.assertEqual(ids, [1, 2, 3])
+
+    def test_add_task_does_not_reuse_removed_ids(self):
+        """Test that IDs stay unique after tasks have been removed."""
+        add_task("First task", 1)
+        add_task("Second task", 2)
+        add_task("Third task", 3)
+        remove_task(1)
+
+        add_task("Fourth task", 4)
+
+        # The new task gets a fresh ID and the existing task 3 is untouched
+        self.assertEqual(get_task_by_id(4)["description"], "Fourth task")
+        self.assertEqual(get_task_by_id(3)["description"], "Third task")
+        self.assertEqual(len(list_all_tasks()), 3)
+
+    def test_add_tasks_bulk(self):
+        """Test that add_tasks adds several tasks in one call."""
+        add_task("Existing task", 2)
+
+        results = add_tasks([("Bulk one", 3), ("Bulk two", 1)])
+
+        # One success message per task
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results, ["Task 2 added.", "Task 3 added."])
+
+        # Tasks get the next IDs and behave like individually added tasks
+        self.assertEqual([task["id"] for task in tasks], [1, 2, 3])
+        self.assertEqual(get_task_by_id(3)["description"], "Bulk two")
+        priorities = [task["priority"] for task in list_all_tasks()]
+        self.assertEqual(priorities, [1, 2, 3])
+        self.assertEqual(remove_task(2), "Task 2 removed.")
+
+    def test_list_all_tasks_empty(self):
+        """Test list_all_tasks returns empty list when no tasks exist."""
+        result = list_all_tasks()
+        self.assertEqual(result, [])
+        self.assertIsInstance(result, list)
+
+    def test_list_all_tasks_reflects_changes(self):
+        """Test that repeated listings stay up to date after adds and removes."""
+        add_task("Second", 2)
+        first_listing = list_all_tasks()
+
+        add_task("First", 1)
+        self.assertEqual([task["description"] for task in list_all_tasks()],
+                         ["First", "Second"])
+
+        remove_task(1)
+        self.assertEqual([task["description"] for task in list_all_tasks()],
+                         ["First"])
+
+        # Mutating a returned list should not affect later listings
+        first_listing.clear()
+        self.assertEqual(len(list_all_tasks()), 1)
+
+    def test_list_pending_high_priority(self):
+        """Test filtering incomplete tasks up to a priority threshold."""
+        add_task("Urgent", 1)
+        add_task("Later", 4)
+        add_task("Important", 2)
+        add_task("Done already", 1)
+        mark_task_done(4)
+
+        result = list_pending_high_priority(2)
+
+        # Only incomplete tasks at priority 1-2, highest priority first
+        self.assertEqual([task["description"] for task in result],
+                         ["Urgent", "Important"])
+
+        # Removing a task keeps the remaining columns in sync
+        remove_task(1)
+        result = list_pending_high_priority(2)
+        self.assertEqual([task["description"] for task in result], ["Important"])
+
+    def test_count_completed_tasks(self):
+        """Test counting completed tasks after marks and removals."""
+        self.assertEqual(count_completed_tasks(), 0)
+
+        add_tasks([("One", 1), ("Two", 2), ("Three", 3)])
+        mark_task_done(1)
+        mark_task_done(3)
+        self.assertEqual(count_completed_tasks(), 2)
+
+        # Removing a completed task swaps another into its slot
+        remove_task(1)
+        self.assertEqual(count_completed_tasks(), 1)
+        self.assertEqual(len(list_pending_high_priority(3)), 1)
+
+    def test_item_assignment_keeps_indexes_in_sync(self):
+        """Test writing task fields by key updates the counts and the ordering."""
+        add_tasks([("One", 1), ("Two", 2), ("Three", 3)])
+
+        get_task_by_id(2)["completed"] = True
+        self.assertEqual(count_completed_tasks(), 1)
+        self.assertEqual(mark_task_done(2), "Task 2 is already completed.")
+
+        get_task_by_id(3)["priority"] = 1
+        self.assertEqual([task["id"] for task in list_all_tasks()], [1, 3, 2])
+        self.assertEqual([task["id"] for task in list_pending_high_priority(1)], [1, 3])
+
+        with self.assertRaises(TypeError):
+            get_task_by_id(1)["id"] = 5
+
+    def test_attribute_assignment_keeps_indexes_in_sync(self):
+        """Test writing task fields as attributes updates the counts and the ordering."""
+        add_tasks([("One", 1), ("Two", 2), ("Three", 3)])
+
+        get_task_by_id(1).completed = True
+        self.assertEqual(count_completed_tasks(), 1)
+
+        get_task_by_id(1).priority = 3
+        self.assertEqual([task["id"] for task in list_all_tasks()], [2, 1, 3])
+
+        with self.assertRaises(TypeError):
+            get_task_by_id(2).id = 7
+
+    def test_mark_task_done_existing_task(self):
+        """Test marking an existing task as done."""
+        add_task("Complete me", 1)
+
+        result = mark_task_done(1)
+
+        # Should return success message
+        self.assertEqual(result, "Task 1 marked as completed.")
+
+        # Task should be marked as completed
+        task = get_task_by_id(1)
+        self.assertTrue(task["completed"])
+
+    def test_mark_task_done_nonexistent_task(self):
+        """Test marking a non-existent task as done."""
+        result = mark_task_done(999)
+
+        # Should return error message
+        self.assertEqual(result, "Task 999 not found.")
+
+    def test_mark_task_done_already_completed(self):
+        """Test marking an already completed task as done."""
+        add_task("Already done", 1)
+        mark_task_done(1)  # Mark it once
+
+        result = mark_task_done(1)  # Mark it again
+
+        # Should report that the task was already completed
+        self.assertEqual(result, "Task 1 is already completed.")
+
+    def test_remove_task_existing(self):
+        """Test removing an existing task."""
+        add_task("Remove me", 1)
+        add_task("Keep me", 2)
+
+        result = remove_task(1)
+
+        # Should return success message
+        self.assertEqual(result, "Task 1 removed.")
+
+        # Should have only one task left
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0]["description"], "Keep me")
+
+    def test_remove_task_keeps_other_tasks_reachable(self):
+        """Test removing a task from the middle leaves the others intact."""
+        add_task("First", 1)
+        add_task("Middle", 2)
+        add_task("Last", 3)
+
+        remove_task(2)
+
+        # Remaining tasks should still be found by their IDs
+        self.assertEqual(len(tasks), 2)
+        self.assertEqual(get_task_by_id(1)["description"], "First")
+        self.assertEqual(get_task_by_id(3)["description"], "Last")
+        self.assertIsNone(get_task_by_id(2))
+
+        # And can still be removed afterwards
+        self.assertEqual(remove_task(3), "Task 3 removed.")
+        self.assertEqual([task["id"] for task in tasks], [1])
+
+    def test_remove_task_nonexistent(self):
+        """Test removing a non-existent task."""
+        add_task("Only task", 1)
+
+        result = remove_task(999)
+
+        # Should return error message
+        self.assertEqual(result, "Task 999 not found.")
+
+        # Should still have the original task
+        self.assertEqual(len(tasks), 1)
+
+    def test_monolithic_characteristics(self):
+        """Test that our implementation demonstrates monolithic characteristics."""
+        # All functions should work with the same global data
+        add_task("Test task", 1)
+
+        # Direct access to global tasks list
+        self.assertEqual(len(tasks), 1)
+
+        # Functions should directly modify global state
+        original_task = tasks[0]
+        mark_task_done(original_task["id"])
+
+        # The same object should be modified (reference equality)
+        self.assertIs(tasks[0], original_task)
+        self.assertTrue(tasks[0]["completed"])
+
+
+class TestReadOnlyQueries(unittest.TestCase):
+    """
+    Tests for queries that don't modify the task list.
+
+    They share one fixture built once for the whole class instead of
+    clearing and re-adding tasks before every test. Tests in this class
+    must not add, remove or complete tasks.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Build the shared fixture once for all tests in this class."""
+        clear_all_tasks()
+        add_task("Low priority", 5)
+        add_task("High priority", 1)
+        add_task("Medium priority", 3)
+        cls.addClassCleanup(clear_all_tasks)
+
+    def test_list_all_tasks_sorted_by_priority(self):
+        """Test that list_all_tasks returns tasks sorted by priority."""
+        result = list_all_tasks()
+
+        # Should return all 3 tasks
+        self.assertEqual(len(result), 3)
+
+        # Should be sorted by priority (1, 3, 5)
+        priorities = [task["priority"] for task in result]
+        self.assertEqual(priorities, [1, 3, 5])
+
+        # Should be the actual task objects
+        self.assertEqual(result[0]["description"], "High priority")
+        self.assertEqual(result[1]["description"], "Medium priority")
+        self.assertEqual(result[2]["description"], "Low priority")
+
+    def test_get_task_by_id_existing(self):
+        """Test get_task_by_id returns correct task for existing ID."""
+        result = get_task_by_id(2)
+
+        self.assertIsNotNone(result)
+        self.assertEqual(result["description"], "High priority")
+        self.assertEqual(result["id"], 2)
+
+    def test_get_task_by_id_nonexistent(self):
+        """Test get_task_by_id returns None for non-existent ID."""
+        result = get_task_by_id(999)
+
+        self.assertIsNone(result)
+
+
+class TestIntegration(unittest.TestCase):
+    """
+    Integration tests that verify the complete workflow.
+    These test realistic usage scenarios.
+    """
+
+    def setUp(self):
+        """Set up clean state before each test."""
+        clear_all_tasks()
+
+    def test_complete_workflow(self):
+        """Test a complete user workflow."""
+        # Add several tasks
+        add_task("Buy groceries", 3)
+        add_task("Study for exam", 1)
+        add_task("Call dentist", 2)
+
+        # List tasks (should be sorted by priority)
+        all_tasks = list_all_tasks()
+        self.assertEqual(len(all_tasks), 3)
+        self.assertEqual(all_tasks[0]["priority"], 1)  # Study first
+        self.assertEqual(all_tasks[1]["priority"], 2)  # Call second
+        self.assertEqual(all_tasks[2]["priority"], 3)  # Groceries last
+
+        # Complete the most important task
+        mark_task_done(2)  # Study for exam (ID 2)
+
+        # Verify it's marked as done
+        study_task = get_task_by_id(2)
+        self.assertTrue(study_task["completed"])
+
+        # Remove a task
+        remove_task(1)  # Remove groceries
+
+        # Should have 2 tasks left
+        remaining_tasks = list_all_tasks()
+        self.assertEqual(len(remaining_tasks), 2)
+
+        # Groceries should be gone
+        groceries_task = get_task_by_id(1)
+        self.assertIsNone(groceries_task)
+
+    def test_edge_cases(self):
+        """Test edge cases and error conditions."""
+        # Operations on empty list
+        self.assertEqual(list_all_tasks(), [])
+        self.assertIsNone(get_task_by_id(1))
+        self.assertEqual(mark_task_done(1), "Task 1 not found.")
+        self.assertEqual(remove_task(1), "Task 1 not found.")
+
+        # Add task and test boundary conditions
+        add_task("Test", 1)
+
+        # Valid operations
+        self.assertIsNotNone(get_task_by_id(1))
+
+        # Invalid operations
+        self.assertIsNone(get_task_by_id(0))
+        self.assertIsNone(get_task_by_id(-1))
+
+
+def run_tests():
+    """
+    Run all tests and provide detailed feedback.
+    This helps students understand what they need to implement.
+    """
+    sys.stdout.write(
+        "🧪 Running Test Suite for Monolithic Todo Manager\n"
+        + "=" * 60 + "\n"
+        "\n"
+        "These tests define exactly what your functions should do.\n"
+        "Implement the functions to make these tests pass!\n"
+        "\n"
+    )
+
+    # Capture test output
+    test_loader = unittest.TestLoader()
+    test_suite = test_loader.loadTestsFromModule(sys.modules[__name__])
+
+    # Run tests with detailed output
+    runner = unittest.TextTestRunner(verbosity=2, stream=sys.stdout)
+    result = runner.run(test_suite)
+
+    # Build the summary first and write it in one go
+    summary = ["\n" + "=" * 60]
+    if result.wasSuccessful():
+        summary += [
+            "🎉 Congratulations! All tests pass!",
+            "Your monolithic architecture implementation is complete!",
+        ]
+    else:
+        summary += [
+            f"❌ {len(result.failures)} test(s) failed, {len(result.errors)} error(s)",
+            "",
+            "💡 Tips for success:",
+            "1. Read the test names and assertions carefully",
+            "2. Implement one function at a time",
+            "3. Run tests frequently to get immediate feedback",
+            "4. Look at the test setup and expected return values",
+            "",
+            "Start with the simplest functions like clear_all_tasks() and add_task()",
+        ]
+    sys.stdout.write("\n".join(summary) + "\n")
+
+    return result.wasSuccessful()
+
+
+# --- Simple Demo Functions ---
+def demo_tdd_process():
+    """
+    Demonstrate the TDD process for educational purposes.
+    """
+    print("📚 Test-Driven Development (TDD) Process:")
+    print("1. 🔴 RED: Write a test that fails")
+    print("2. 🟢 GREEN: Write minimal code to make it pass")
+    print("3. 🔵 REFACTOR: Improve the code while keeping tests green")
+    print("4. Repeat!")
+    print()
+    print("In this exercise:")
+    print("- Tests are already written (they define requirements)")
+    print("- Your job is to make them pass")
+    print("- Tests give you immediate feedback")
+    print("- Tests document expected behavior")
+    print()
+
+
+if __name__ == "__main__":
+    print("🎯 Monolithic Architecture - Test-Driven Development Exercise")
+    print()
+
+    # Show the TDD process
+    demo_tdd_process()
+
+    # Run the tests
+    success = run_tests()
+
+    if not success:
+        print("\n🚀 Ready to start? Here's your roadmap:")
+        print("1. Look at the failing tests to understand requirements")
+        print("2. Implement clear_all_tasks() first (simplest)")
+        print("3. Then add_task() - check test_add_task_creates_correct_structure")
+        print("4. Continue with list_all_tasks(), get_task_by_id(), etc.")
+        print("5. Run tests after each implementation: python3 test_todo_manager.py")
+        print()
+        print("Good luck! The tests will guide you! 🎉")
\ No newline at end of file
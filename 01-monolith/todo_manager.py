@@ -14,7 +14,7 @@ ARCHITECTURAL CHARACTERISTICS:
 - Single point of deployment
 
 TDD APPROACH:
-1. Read and understand the tests (they define the requirements)
+1. Read and understand the tests in test_todo_manager.py (they define the requirements)
 2. Run the tests (they will fail initially)
 3. Implement just enough code to make tests pass
 4. Refactor if needed
@@ -27,435 +27,266 @@ LEARNING OBJECTIVES:
 - See how tests can drive design and requirements
 """
 
-import unittest
 import sys
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import chain, count
+from operator import attrgetter
+
+# --- Task Record ---
+@dataclass(slots=True)
+class Task:
+    """
+    A single todo item.
+
+    Slotted to keep per-task memory small; item access (task["priority"])
+    and `"id" in task` are supported so tasks can still be used like dicts.
+    Once a task is stored, writing its priority or completion flag (as an
+    attribute or by key) also updates the module's indexes, and its id
+    can no longer be changed.
+    """
+    id: int
+    description: str
+    priority: int
+    completed: bool = False
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __setattr__(self, name, value):
+        setter = _INDEXED_SETTERS.get(name)
+        # getattr: while __init__ runs, the id slot may not be filled yet
+        if setter is not None and _tasks_by_id.get(getattr(self, "id", None)) is self:
+            setter(self, value)
+        else:
+            object.__setattr__(self, name, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
 
 # --- Global Data Storage ---
 # In a monolith, we typically use global variables for data storage
 tasks = []
+# Lookup index kept in sync with `tasks` so id lookups are O(1)
+_tasks_by_id = {}
+# Position of each task in `tasks`, so removal doesn't need to search the list
+_task_pos = {}
+# Tasks grouped by priority (in insertion order) for cheap sorted listing
+_by_priority = defaultdict(list)
+# Distinct priorities in ascending order, maintained on insert/remove
+_priority_order = []
+# Bumped whenever the set of tasks changes; completion doesn't affect order
+_order_version = 0
+# Last list_all_tasks() result and the _order_version it was built at
+_listing_cache = []
+_listing_version = -1
+# Source of task IDs; never reuses an ID, even after removals
+_id_counter = count(1)
+# Completion flag of each task, parallel to `tasks`, so bulk status counts
+# scan a contiguous buffer instead of task objects
+_completed = bytearray()
+
+
+# Descriptions up to this length are interned so repeated ones share memory
+_INTERN_MAX_LEN = 64
+
+
+# --- Status Messages ---
+# Bound once so the hot paths don't rebuild the format on every call
+_ADDED_MSG = "Task {} added.".format
+_NOT_FOUND_MSG = "Task {} not found.".format
+_ALREADY_DONE_MSG = "Task {} is already completed.".format
+_COMPLETED_MSG = "Task {} marked as completed.".format
+_REMOVED_MSG = "Task {} removed.".format
+
+
+# --- Core Functions ---
+# Every function reads and writes the global task storage directly
+
+def _intern_description(description):
+    """Share one string object between tasks with the same short description."""
+    if type(description) is str and len(description) <= _INTERN_MAX_LEN:
+        return sys.intern(description)
+    return description
 
 
-# --- Core Functions (TO BE IMPLEMENTED) ---
-# Your job is to implement these functions to make the tests pass
-
 def add_task(description, priority):
     """
-    TODO: Implement this function to make the tests pass.
-"""
-    task_id = len(tasks) + 1
-    task = {
-        "id": task_id,
-        "description": description,
-        "priority": priority,
-        "completed": False
-    }
-    tasks.append(task)
-    return f"Task {task_id} added."
-    pass
-
-
-
-
-def list_all_tasks():
-    """
-    TODO: Implement this function to make the tests pass.
-    Look at test_list_all_tasks() to understand the requirements.
-    """
-   
-    return sorted(tasks, key=lambda task: task["priority"])
-
-    pass
-
-
-def mark_task_done(task_id):
-    """
-    TODO: Implement this function to make the tests pass.
+    Add a task and return its confirmation message.
 
-    Look at test_mark_task_done() to understand the requirements.
+    The task gets the next ID from _id_counter and is indexed by ID, position
+    and priority.
     """
-
-    task = get_task_by_id(task_id)
-    if task is None:
-        return f"Task {task_id} not found."
-    
-    if task["completed"]:
-        return f"Task {task_id} is already completed."
-    
-    task["completed"] = True
-    return f"Task {task_id} marked as completed."
-
-    pass
+    global _order_version
+    task_id = next(_id_counter)
+    task = Task(task_id, _intern_description(description), priority)
+    _task_pos[task_id] = len(tasks)
+    tasks.append(task)
+    _completed.append(0)
+    _tasks_by_id[task_id] = task
+    if priority not in _by_priority:
+        insort(_priority_order, priority)
+    _by_priority[priority].append(task)
+    _order_version += 1
+    return _ADDED_MSG(task_id)
 
 
-def remove_task(task_id):
+def add_tasks(task_specs):
     """
-    TODO: Implement this function to make the tests pass.
+    Add many tasks at once from (description, priority) pairs.
 
-    Look at test_remove_task() to understand the requirements.
+    Grows the tasks list with a single extend() instead of one append per
+    task, which is cheaper for bulk loads. Returns one message per task.
     """
-
-    global tasks
-    task = get_task_by_id(task_id)
-    if task is None:
-        return f"Task {task_id} not found."
-    
-    tasks.remove(task)
-    return f"Task {task_id} removed."
-    pass
+    global _order_version
+    new_tasks = [Task(next(_id_counter), _intern_description(description), priority)
+                 for description, priority in task_specs]
+
+    for pos, task in enumerate(new_tasks, len(tasks)):
+        _task_pos[task.id] = pos
+        _tasks_by_id[task.id] = task
+        if task.priority not in _by_priority:
+            insort(_priority_order, task.priority)
+        _by_priority[task.priority].append(task)
+    tasks.extend(new_tasks)
+    _completed.extend(bytes(len(new_tasks)))
+    _order_version += 1
+    return [_ADDED_MSG(task.id) for task in new_tasks]
 
 
-def get_task_by_id(task_id):
+def list_all_tasks():
     """
-    TODO: Implement this helper function to make the tests pass.
+    Return all tasks sorted by priority, ties in insertion order.
 
-    Look at test_get_task_by_id() to understand the requirements.
+    The listing is rebuilt from the priority buckets only when the set of
+    tasks has changed since the last call; callers get a copy.
     """
+    global _listing_cache, _listing_version
 
-    for task in tasks:
-        if task["id"] == task_id:
-            return task
-    return None
-    pass
+    if _listing_version != _order_version:
+        buckets = map(_by_priority.__getitem__, _priority_order)
+        _listing_cache = list(chain.from_iterable(buckets))
+        _listing_version = _order_version
+    # Hand out a copy so callers can't corrupt the cached ordering
+    return _listing_cache.copy()
 
 
-def clear_all_tasks():
+def list_pending_high_priority(max_priority):
     """
-    TODO: Implement this function to make the tests pass.
+    Return the incomplete tasks with priority <= max_priority, by priority.
 
-    This is used for testing - it should remove all tasks.
+    Only the priority buckets up to max_priority are visited; they are
+    found by bisecting the sorted priority list and are already in order.
     """
-def clear_all_tasks():
-    global tasks
-    tasks.clear()
-
-    pass
+    cutoff = bisect_right(_priority_order, max_priority)
+    buckets = map(_by_priority.__getitem__, _priority_order[:cutoff])
+    return [task for task in chain.from_iterable(buckets) if not task.completed]
 
 
-# --- Test Suite ---
-class TestTodoManager(unittest.TestCase):
-    """
-    Test suite that defines the requirements for our monolithic todo manager.
+def count_completed_tasks():
+    """Return how many tasks are completed, counted over the completion column."""
+    return _completed.count(1)
 
-    These tests serve as:
-    1. Requirements specification
-    2. Design documentation
-    3. Acceptance criteria
-    4. Regression protection
 
-    Read these tests carefully - they tell you exactly what to implement!
+def mark_task_done(task_id):
     """
+    Mark a task as completed and return a status message.
 
-    def setUp(self):
-        """Set up clean state before each test."""
-        clear_all_tasks()
-
-    def test_clear_all_tasks(self):
-        """Test that we can clear all tasks (needed for test isolation)."""
-        # First add some tasks
-        add_task("Test task", 1)
-        add_task("Another task", 2)
-
-        # Then clear them
-        clear_all_tasks()
-
-        # Should have no tasks
-        self.assertEqual(len(tasks), 0)
-
-    def test_add_task_creates_correct_structure(self):
-        """Test that add_task creates a task with the correct structure."""
-        result = add_task("Buy groceries", 2)
-
-        # Should return a success message
-        self.assertIn("Task", result)
-        self.assertIn("added", result.lower())
-
-        # Should add exactly one task
-        self.assertEqual(len(tasks), 1)
-
-        # Task should have correct structure
-        task = tasks[0]
-        self.assertIn("id", task)
-        self.assertIn("description", task)
-        self.assertIn("priority", task)
-        self.assertIn("completed", task)
-
-        # Task should have correct values
-        self.assertEqual(task["description"], "Buy groceries")
-        self.assertEqual(task["priority"], 2)
-        self.assertEqual(task["completed"], False)
-        self.assertIsInstance(task["id"], int)
-        self.assertGreater(task["id"], 0)
-
-    def test_add_task_generates_unique_ids(self):
-        """Test that add_task generates unique, sequential IDs."""
-        add_task("First task", 1)
-        add_task("Second task", 2)
-        add_task("Third task", 3)
-
-        # Should have 3 tasks
-        self.assertEqual(len(tasks), 3)
-
-        # IDs should be unique and sequential
-        ids = [task["id"] for task in tasks]
-        self.assertEqual(ids, [1, 2, 3])
-
-    def test_list_all_tasks_empty(self):
-        """Test list_all_tasks returns empty list when no tasks exist."""
-        result = list_all_tasks()
-        self.assertEqual(result, [])
-        self.assertIsInstance(result, list)
-
-    def test_list_all_tasks_sorted_by_priority(self):
-        """Test that list_all_tasks returns tasks sorted by priority."""
-        add_task("Low priority", 5)
-        add_task("High priority", 1)
-        add_task("Medium priority", 3)
-
-        result = list_all_tasks()
-
-        # Should return all 3 tasks
-        self.assertEqual(len(result), 3)
-
-        # Should be sorted by priority (1, 3, 5)
-        priorities = [task["priority"] for task in result]
-        self.assertEqual(priorities, [1, 3, 5])
-
-        # Should be the actual task objects
-        self.assertEqual(result[0]["description"], "High priority")
-        self.assertEqual(result[1]["description"], "Medium priority")
-        self.assertEqual(result[2]["description"], "Low priority")
-
-    def test_get_task_by_id_existing(self):
-        """Test get_task_by_id returns correct task for existing ID."""
-        add_task("Find me", 1)
-        add_task("Not me", 2)
-
-        result = get_task_by_id(1)
-
-        self.assertIsNotNone(result)
-        self.assertEqual(result["description"], "Find me")
-        self.assertEqual(result["id"], 1)
-
-    def test_get_task_by_id_nonexistent(self):
-        """Test get_task_by_id returns None for non-existent ID."""
-        add_task("Only task", 1)
-
-        result = get_task_by_id(999)
-
-        self.assertIsNone(result)
-
-    def test_mark_task_done_existing_task(self):
-        """Test marking an existing task as done."""
-        add_task("Complete me", 1)
-
-        result = mark_task_done(1)
-
-        # Should return success message
-        self.assertIn("completed", result.lower())
-        self.assertIn("1", result)
-
-        # Task should be marked as completed
-        task = get_task_by_id(1)
-        self.assertTrue(task["completed"])
-
-    def test_mark_task_done_nonexistent_task(self):
-        """Test marking a non-existent task as done."""
-        result = mark_task_done(999)
-
-        # Should return error message
-        self.assertIn("not found", result.lower())
-        self.assertIn("999", result)
-
-    def test_mark_task_done_already_completed(self):
-        """Test marking an already completed task as done."""
-        add_task("Already done", 1)
-        mark_task_done(1)  # Mark it once
-
-        result = mark_task_done(1)  # Mark it again
-
-        # Should handle gracefully (either success or already completed message)
-        self.assertIsInstance(result, str)
-        self.assertGreater(len(result), 0)
-
-    def test_remove_task_existing(self):
-        """Test removing an existing task."""
-        add_task("Remove me", 1)
-        add_task("Keep me", 2)
-
-        result = remove_task(1)
-
-        # Should return success message
-        self.assertIn("removed", result.lower())
-        self.assertIn("1", result)
-
-        # Should have only one task left
-        self.assertEqual(len(tasks), 1)
-        self.assertEqual(tasks[0]["description"], "Keep me")
-
-    def test_remove_task_nonexistent(self):
-        """Test removing a non-existent task."""
-        add_task("Only task", 1)
-
-        result = remove_task(999)
-
-        # Should return error message
-        self.assertIn("not found", result.lower())
-        self.assertIn("999", result)
-
-        # Should still have the original task
-        self.assertEqual(len(tasks), 1)
-
-    def test_monolithic_characteristics(self):
-        """Test that our implementation demonstrates monolithic characteristics."""
-        # All functions should work with the same global data
-        add_task("Test task", 1)
-
-        # Direct access to global tasks list
-        self.assertEqual(len(tasks), 1)
-
-        # Functions should directly modify global state
-        original_task = tasks[0]
-        mark_task_done(original_task["id"])
-
-        # The same object should be modified (reference equality)
-        self.assertIs(tasks[0], original_task)
-        self.assertTrue(tasks[0]["completed"])
-
-
-class TestIntegration(unittest.TestCase):
-    """
-    Integration tests that verify the complete workflow.
-    These test realistic usage scenarios.
+    Reports unknown IDs and tasks that are already completed instead.
     """
 
-    def setUp(self):
-        """Set up clean state before each test."""
-        clear_all_tasks()
-
-    def test_complete_workflow(self):
-        """Test a complete user workflow."""
-        # Add several tasks
-        add_task("Buy groceries", 3)
-        add_task("Study for exam", 1)
-        add_task("Call dentist", 2)
-
-        # List tasks (should be sorted by priority)
-        all_tasks = list_all_tasks()
-        self.assertEqual(len(all_tasks), 3)
-        self.assertEqual(all_tasks[0]["priority"], 1)  # Study first
-        self.assertEqual(all_tasks[1]["priority"], 2)  # Call second
-        self.assertEqual(all_tasks[2]["priority"], 3)  # Groceries last
-
-        # Complete the most important task
-        mark_task_done(2)  # Study for exam (ID 2)
-
-        # Verify it's marked as done
-        study_task = get_task_by_id(2)
-        self.assertTrue(study_task["completed"])
-
-        # Remove a task
-        remove_task(1)  # Remove groceries
+    task = _tasks_by_id.get(task_id)
+    if task is None:
+        return _NOT_FOUND_MSG(task_id)
+    if task.completed:
+        return _ALREADY_DONE_MSG(task_id)
+    task.completed = True  # also sets the task's _completed entry
+    return _COMPLETED_MSG(task_id)
 
-        # Should have 2 tasks left
-        remaining_tasks = list_all_tasks()
-        self.assertEqual(len(remaining_tasks), 2)
 
-        # Groceries should be gone
-        groceries_task = get_task_by_id(1)
-        self.assertIsNone(groceries_task)
+def remove_task(task_id):
+    """Remove a task by ID and return a status message."""
 
-    def test_edge_cases(self):
-        """Test edge cases and error conditions."""
-        # Operations on empty list
-        self.assertEqual(list_all_tasks(), [])
-        self.assertIsNone(get_task_by_id(1))
-        self.assertIn("not found", mark_task_done(1).lower())
-        self.assertIn("not found", remove_task(1).lower())
+    global _order_version
+    task = _tasks_by_id.pop(task_id, None)
+    if task is None:
+        return _NOT_FOUND_MSG(task_id)
+
+    # Swap the last task into the freed slot; list_all_tasks() orders by priority,
+    # so storage order doesn't matter and removal stays O(1).
+    idx = _task_pos.pop(task_id)
+    last = tasks.pop()
+    last_completed = _completed.pop()
+    if idx != len(tasks):
+        tasks[idx] = last
+        _completed[idx] = last_completed
+        _task_pos[last.id] = idx
+
+    bucket = _by_priority[task.priority]
+    bucket.remove(task)
+    if not bucket:
+        del _by_priority[task.priority]
+        del _priority_order[bisect_left(_priority_order, task.priority)]
+    _order_version += 1
+    return _REMOVED_MSG(task_id)
+
+
+def _set_completed(task, completed):
+    """Set a stored task's completion flag and the matching _completed entry."""
+    completed = bool(completed)
+    object.__setattr__(task, "completed", completed)
+    _completed[_task_pos[task.id]] = completed
+
+
+def _set_priority(task, priority):
+    """Move a stored task to another priority bucket, keeping insertion order."""
+    global _order_version
+    bucket = _by_priority[task.priority]
+    bucket.remove(task)
+    if not bucket:
+        del _by_priority[task.priority]
+        del _priority_order[bisect_left(_priority_order, task.priority)]
+    object.__setattr__(task, "priority", priority)
+    if priority not in _by_priority:
+        insort(_priority_order, priority)
+    # IDs grow with insertion order, so this is where the task would have been added
+    insort(_by_priority[priority], task, key=attrgetter("id"))
+    _order_version += 1
+
+
+def _reject_id_change(task, task_id):
+    raise TypeError("task IDs cannot be changed")
+
+
+# Fields of a stored task whose writes must go through the indexes
+_INDEXED_SETTERS = {"id": _reject_id_change, "priority": _set_priority,
+                    "completed": _set_completed}
 
-        # Add task and test boundary conditions
-        add_task("Test", 1)
 
-        # Valid operations
-        self.assertIsNotNone(get_task_by_id(1))
+def get_task_by_id(task_id):
+    """Return the task with this ID, or None."""
 
-        # Invalid operations
-        self.assertIsNone(get_task_by_id(0))
-        self.assertIsNone(get_task_by_id(-1))
+    return _tasks_by_id.get(task_id)
 
 
-def run_tests():
-    """
-    Run all tests and provide detailed feedback.
-    This helps students understand what they need to implement.
-    """
-    print("🧪 Running Test Suite for Monolithic Todo Manager")
-    print("=" * 60)
-    print()
-    print("These tests define exactly what your functions should do.")
-    print("Implement the functions to make these tests pass!")
-    print()
-
-    # Capture test output
-    test_loader = unittest.TestLoader()
-    test_suite = test_loader.loadTestsFromModule(sys.modules[__name__])
-
-    # Run tests with detailed output
-    runner = unittest.TextTestRunner(verbosity=2, stream=sys.stdout)
-    result = runner.run(test_suite)
-
-    print("\n" + "=" * 60)
-    if result.wasSuccessful():
-        print("🎉 Congratulations! All tests pass!")
-        print("Your monolithic architecture implementation is complete!")
-    else:
-        print(f"❌ {len(result.failures)} test(s) failed, {len(result.errors)} error(s)")
-        print()
-        print("💡 Tips for success:")
-        print("1. Read the test names and assertions carefully")
-        print("2. Implement one function at a time")
-        print("3. Run tests frequently to get immediate feedback")
-        print("4. Look at the test setup and expected return values")
-        print()
-        print("Start with the simplest functions like clear_all_tasks() and add_task()")
-
-    return result.wasSuccessful()
-
-
-# --- Simple Demo Functions ---
-def demo_tdd_process():
-    """
-    Demonstrate the TDD process for educational purposes.
-    """
-    print("📚 Test-Driven Development (TDD) Process:")
-    print("1. 🔴 RED: Write a test that fails")
-    print("2. 🟢 GREEN: Write minimal code to make it pass")
-    print("3. 🔵 REFACTOR: Improve the code while keeping tests green")
-    print("4. Repeat!")
-    print()
-    print("In this exercise:")
-    print("- Tests are already written (they define requirements)")
-    print("- Your job is to make them pass")
-    print("- Tests give you immediate feedback")
-    print("- Tests document expected behavior")
-    print()
-
-
-if __name__ == "__main__":
-    print("🎯 Monolithic Architecture - Test-Driven Development Exercise")
-    print()
-
-    # Show the TDD process
-    demo_tdd_process()
-
-    # Run the tests
-    success = run_tests()
-
-    if not success:
-        print("\n🚀 Ready to start? Here's your roadmap:")
-        print("1. Look at the failing tests to understand requirements")
-        print("2. Implement clear_all_tasks() first (simplest)")
-        print("3. Then add_task() - check test_add_task_creates_correct_structure")
-        print("4. Continue with list_all_tasks(), get_task_by_id(), etc.")
-        print("5. Run tests after each implementation: python3 this_file.py")
-        print()
-        print("Good luck! The tests will guide you! 🎉")
\ No newline at end of file
+def clear_all_tasks():
+    """Remove all tasks and reset the indexes and the ID counter."""
+    global _order_version, _id_counter
+    tasks.clear()
+    _tasks_by_id.clear()
+    _task_pos.clear()
+    _by_priority.clear()
+    _priority_order.clear()
+    _order_version += 1
+    _id_counter = count(1)
+    _completed.clear()
@@ -19,7 +19,7 @@ LAYERS IN THIS SYSTEM:
 3. PRESENTATION LAYER: User interface and input/output formatting
 
 TDD APPROACH:
-1. Read and understand the tests (they define the requirements)
+1. Read and understand the tests in test_library_management.py (they define the requirements)
 2. Run the tests (they will fail initially)
 3. Implement just enough code to make tests pass
 4. Follow layered architecture principles
@@ -33,676 +33,615 @@ LEARNING OBJECTIVES:
 - Experience how layered design improves maintainability
 """
 
-import unittest
 import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
 
-# --- GLOBAL DATA STORAGE ---
-# In layered architecture, data storage is isolated in the data layer
-books_db = {}
-users_db = {}
-transactions_db = []
+# --- BOOK RECORD ---
+@dataclass(slots=True)
+class Book:
+    """
+    A book in the catalog.
 
+    Slotted to keep per-book memory small; item access (book["title"]),
+    book.get(), `"isbn" in book` and dict(book) are supported so books can
+    still be used like dicts.
+    """
+    title: str
+    author: str
+    isbn: str
+    total_copies: int
+    available_copies: int
 
-# --- DATA ACCESS LAYER ---
-# This layer handles all direct data storage operations
-# It should NOT contain business logic - only CRUD operations
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
 
-def get_all_books():
-    """
-    TODO: Implement this data access function.
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
 
-    Should return a copy of all books in the database.
-    Look at test_data_layer_get_all_books() for requirements.
-    """
-    pass
+    def __contains__(self, key):
+        return key in self.__slots__
 
+    def keys(self):
+        return self.__slots__
 
-def get_book_by_id(book_id):
-    """
-    TODO: Implement this data access function.
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
 
-    Should return a specific book by ID or None if not found.
-    Look at test_data_layer_get_book_by_id() for requirements.
-    """
-    pass
+    def copy(self):
+        return replace(self)
 
 
-def save_book(book_id, book_data):
+class Transaction(NamedTuple):
     """
-    TODO: Implement this data access function.
+    One borrow/return entry in the transaction log.
 
-    Should save/update a book in the database.
-    Look at test_data_layer_save_book() for requirements.
+    A tuple is much smaller than a dict per entry; transaction["action"]
+    still works alongside transaction.action and transaction[2].
     """
-    pass
+    user_id: str
+    book_id: int
+    action: str
+    timestamp: int  # time.time_ns(); see format_timestamp()
 
+    def __getitem__(self, key):
+        if type(key) is str:
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
 
-def get_user_borrowed_books(user_id):
-    """
-    TODO: Implement this data access function.
 
-    Should return list of book IDs borrowed by a user.
-    Look at test_data_layer_user_books() for requirements.
-    """
-    pass
+def _stale_after(method):
+    """Wrap a dict method so that calling it marks the book indexes stale."""
+    def write(self, *args, **kwargs):
+        global _indexes_stale
+        _indexes_stale = True
+        return method(self, *args, **kwargs)
+    return write
 
 
-def save_user_borrowed_book(user_id, book_id):
+class _BookStore(dict):
     """
-    TODO: Implement this data access function.
-
-    Should record that a user has borrowed a book.
-    Look at test_data_layer_user_books() for requirements.
+    The books_db dict. save_book() keeps the indexes below up to date as it
+    writes; any other write (books_db[1] = {...}, del, update(), ...) marks
+    them stale so they are rebuilt from the records on their next read.
     """
-    pass
+    __slots__ = ()
+    __setitem__ = _stale_after(dict.__setitem__)
+    __delitem__ = _stale_after(dict.__delitem__)
+    __ior__ = _stale_after(dict.__ior__)
+    pop = _stale_after(dict.pop)
+    popitem = _stale_after(dict.popitem)
+    setdefault = _stale_after(dict.setdefault)
+    update = _stale_after(dict.update)
+    clear = _stale_after(dict.clear)
 
 
-def remove_user_borrowed_book(user_id, book_id):
-    """
-    TODO: Implement this data access function.
+# --- GLOBAL DATA STORAGE ---
+# In layered architecture, data storage is isolated in the data layer
+books_db = _BookStore()
+users_db = {}  # user_id -> set of borrowed book IDs
+transactions_db = []
 
-    Should remove a book from user's borrowed list.
-    Look at test_data_layer_user_books() for requirements.
-    """
-    pass
+_next_book_id = 1  # kept past the highest ID saved by save_book()
+# Held while a write updates a record together with its indexes, so
+# concurrent workflows never see them half-updated
+_write_lock = threading.RLock()
+# Indexes over books_db, maintained by save_book() and rebuilt by
+# _refresh_indexes() after any other write.
+# IDs of books with at least one available copy
+_available_book_ids = set()
+# available_copies of every saved book as one contiguous column, so counting
+# queries scan plain integers instead of book records
+_available_copies = array("l")
+_copies_slot = {}  # book_id -> position in _available_copies
+# ISBN lookups without scanning the catalog: isbn -> book_id, and the ISBN
+# each book was last saved with so changing it drops the old entry
+_isbn_index = {}
+_book_isbns = {}
+# Set when books_db is written without save_book(); see _BookStore
+_indexes_stale = False
+# Read-only live view of books_db; stays valid because the store is only
+# ever cleared in place, never rebound
+_books_view = MappingProxyType(books_db)
 
 
-def log_transaction(user_id, book_id, action, timestamp):
+class _BatchState(threading.local):
     """
-    TODO: Implement this data access function.
+    Per-thread transaction_batch() state: how many batches are open and the
+    transactions logged inside them, written out when the outermost one ends.
 
-    Should record a transaction (borrow/return) in the transaction log.
-    Look at test_data_layer_transactions() for requirements.
+    Kept per thread so one thread's batch never holds back another thread's
+    log_transaction() calls.
     """
-    pass
+    def __init__(self):
+        self.depth = 0
+        self.pending = []
 
 
-def clear_all_data():
-    """
-    TODO: Implement this data access function.
+_batch = _BatchState()
+# Buffered transactions are written out early once this many pile up
+_TX_FLUSH_SIZE = 1024
 
-    Should clear all data from all databases (for testing).
-    """
-    pass
 
+# --- DATA ACCESS LAYER ---
+# This layer handles all direct data storage operations
+# It should NOT contain business logic - only CRUD operations
 
-# --- BUSINESS LOGIC LAYER ---
-# This layer contains all business rules and workflows
-# It should ONLY call data access layer functions (not directly access global data)
-# It should NOT handle user input/output (that's presentation layer)
+def _intern(value):
+    """Share one string object between records holding the same text."""
+    return sys.intern(value) if type(value) is str else value
 
-def add_book_to_library(title, author, isbn, copies=1):
+
+def get_all_books():
     """
-    TODO: Implement this business logic function.
+    Return a copy of all books, keyed by book ID.
 
-    Should add a new book to the library with proper validation.
-    Must use data access layer functions only.
-    Look at test_business_layer_add_book() for requirements.
+    Copies on every call; read-only callers should use get_books_view().
     """
-    pass
+    with _write_lock:
+        return books_db.copy()
 
 
-def is_book_available_for_borrowing(book_id):
+def get_books_view():
     """
-    TODO: Implement this business logic function.
+    Return a read-only, live view of all books without copying them.
 
-    Should check if a book can be borrowed (exists and has available copies).
-    Must use data access layer functions only.
-    Look at test_business_layer_availability() for requirements.
+    For callers that only read the catalog; use get_all_books() when a
+    dict you can modify is needed.
     """
-    pass
+    return _books_view
 
 
-def borrow_book_workflow(user_id, book_id):
+def get_book_by_id(book_id):
     """
-    TODO: Implement this business logic function.
+    Return the book with this ID, or None if there is none.
 
-    Should handle the complete borrowing workflow with business rules.
-    Must use data access layer functions only.
-    Look at test_business_layer_borrow() for requirements.
+    Returns the stored record itself, not a copy; save changes through
+    save_book() so the indexes are updated.
     """
-    pass
+    return books_db.get(book_id)
 
 
-def return_book_workflow(user_id, book_id):
-    """
-    TODO: Implement this business logic function.
-
-    Should handle the complete return workflow with validation.
-    Must use data access layer functions only.
-    Look at test_business_layer_return() for requirements.
+def save_book(book_id, book_data):
     """
-    pass
+    Store a book record under book_id and update the indexes with it.
+
+    Dicts are converted to Book. The record and its index entries change
+    together under _write_lock.
+    """
+    global _next_book_id
+    if type(book_data) is dict:
+        book_data = Book(**book_data)
+    # Authors and ISBNs repeat across copies and editions; store each once.
+    # A caller's record is copied rather than changed behind its back.
+    author = _intern(book_data.author)
+    isbn = _intern(book_data.isbn)
+    if author is not book_data.author or isbn is not book_data.isbn:
+        book_data = replace(book_data, author=author, isbn=isbn)
+    # The indexes below must change together with the record
+    with _write_lock:
+        dict.__setitem__(books_db, book_id, book_data)  # indexes are updated below
+        # Books without an ISBN aren't indexed, so they never clash
+        new_isbn = book_data.isbn or None
+        old_isbn = _book_isbns.get(book_id)
+        if old_isbn != new_isbn:
+            if old_isbn is not None and _isbn_index.get(old_isbn) == book_id:
+                del _isbn_index[old_isbn]
+            if new_isbn is None:
+                del _book_isbns[book_id]
+            else:
+                _isbn_index[new_isbn] = book_id
+                _book_isbns[book_id] = new_isbn
+        if type(book_id) is int and book_id >= _next_book_id:
+            _next_book_id = book_id + 1
+        slot = _copies_slot.get(book_id)
+        if slot is None:
+            _copies_slot[book_id] = len(_available_copies)
+            _available_copies.append(book_data.available_copies)
+        else:
+            _available_copies[slot] = book_data.available_copies
+        if book_data.available_copies > 0:
+            _available_book_ids.add(book_id)
+        else:
+            _available_book_ids.discard(book_id)
+
+
+def _field(record, key, default):
+    """Read one field of a book record, which may be a Book or a plain dict."""
+    try:
+        return record[key]
+    except KeyError:
+        return default
+
+
+def _refresh_indexes():
+    """Rebuild the book indexes from books_db if it was written around save_book()."""
+    global _indexes_stale, _next_book_id
+    if not _indexes_stale:
+        return
+    with _write_lock:
+        _available_book_ids.clear()
+        del _available_copies[:]
+        _copies_slot.clear()
+        _isbn_index.clear()
+        _book_isbns.clear()
+        for book_id, book in books_db.items():
+            copies = _field(book, "available_copies", 0)
+            _copies_slot[book_id] = len(_available_copies)
+            _available_copies.append(copies)
+            if copies > 0:
+                _available_book_ids.add(book_id)
+            isbn = _field(book, "isbn", None)
+            if isbn:
+                _isbn_index[isbn] = book_id
+                _book_isbns[book_id] = isbn
+            if type(book_id) is int and book_id >= _next_book_id:
+                _next_book_id = book_id + 1
+        _indexes_stale = False
+
+
+def get_book_id_by_isbn(isbn):
+    """Return the ID of the book saved with this ISBN, or None."""
+    _refresh_indexes()
+    return _isbn_index.get(isbn)
+
+
+def get_next_book_id():
+    """Return an ID no saved book uses yet."""
+    _refresh_indexes()
+    return _next_book_id
+
+
+def get_available_book_ids():
+    """
+    Return the IDs of all books that have at least one copy available.
+
+    Served from an index kept up to date by save_book(), so this doesn't
+    need to look at every book in the database.
+    """
+    _refresh_indexes()
+    with _write_lock:
+        return sorted(_available_book_ids)
+
+
+def get_available_copies_column():
+    """Return the available_copies of every saved book as an array of ints."""
+    _refresh_indexes()
+    with _write_lock:
+        return _available_copies[:]
 
 
-def get_user_borrowed_books_with_details(user_id):
+def get_user_borrowed_books(user_id):
     """
-    TODO: Implement this business logic function.
+    Return the IDs of the books a user has borrowed.
 
-    Should return detailed info about books borrowed by a user.
-    Must use data access layer functions only.
-    Look at test_business_layer_user_details() for requirements.
+    The list is a snapshot; use has_user_borrowed_book() for membership.
     """
-    pass
+    with _write_lock:
+        return list(users_db.get(user_id, ()))
 
 
-def get_available_books_list():
-    """
-    TODO: Implement this business logic function.
+def has_user_borrowed_book(user_id, book_id):
+    """Return True if the user currently has the book borrowed."""
+    return book_id in users_db.get(user_id, ())
 
-    Should return list of books that are available for borrowing.
-    Must use data access layer functions only.
-    Look at test_business_layer_available_books() for requirements.
-    """
-    pass
+
+def save_user_borrowed_book(user_id, book_id):
+    """Record that a user has borrowed a book."""
+    with _write_lock:
+        users_db.setdefault(user_id, set()).add(book_id)
 
 
-# --- PRESENTATION LAYER ---
-# This layer handles user interface, input validation, and output formatting
-# It should ONLY call business logic layer functions (not data access directly)
+def remove_user_borrowed_book(user_id, book_id):
+    """Remove a book from a user's borrowed books, if it is there."""
+    with _write_lock:
+        borrowed = users_db.get(user_id)
+        if borrowed is not None:
+            borrowed.discard(book_id)
 
-def format_book_display(books_list):
+
+def _timestamp_ns(timestamp):
+    """Return a timestamp as nanoseconds, accepting ints or ISO 8601 strings."""
+    if type(timestamp) is str:
+        # Whole microseconds, so the float round trip can't drift
+        return round(datetime.fromisoformat(timestamp).timestamp() * 1e6) * 1000
+    return timestamp
+
+
+def log_transaction(user_id, book_id, action, timestamp):
     """
-    TODO: Implement this presentation function.
+    Record a borrow or return in the transaction log.
 
-    Should format a list of books for display to users.
-    Must use business logic layer functions only.
-    Look at test_presentation_layer_formatting() for requirements.
+    ISO 8601 timestamps are converted, so the log only holds nanosecond ints.
+    Inside transaction_batch() the entry is buffered until the batch ends.
     """
-    pass
+    transaction = Transaction(user_id, book_id, _intern(action), _timestamp_ns(timestamp))
+    if _batch.depth:
+        _batch.pending.append(transaction)
+        if len(_batch.pending) >= _TX_FLUSH_SIZE:
+            flush_transactions()
+    else:
+        with _write_lock:
+            transactions_db.append(transaction)
 
 
-def parse_user_input(input_string, expected_type):
+def flush_transactions():
+    """Write this thread's buffered transactions to the transaction log in one go."""
+    with _write_lock:
+        transactions_db.extend(_batch.pending)
+    _batch.pending.clear()
+
+
+@contextmanager
+def transaction_batch():
     """
-    TODO: Implement this presentation function.
+    Buffer transactions logged inside the block and write them out together.
 
-    Should parse and validate user input.
-    Look at test_presentation_layer_input_parsing() for requirements.
+    Batches nest; the log is written when the outermost one ends, or every
+    _TX_FLUSH_SIZE entries in long batches, so a store with a per-write cost
+    pays it once per batch rather than per entry.
     """
-    pass
+    _batch.depth += 1
+    try:
+        yield
+    finally:
+        _batch.depth -= 1
+        if not _batch.depth:
+            flush_transactions()
 
 
-def display_user_borrowed_books(user_id):
+def clear_all_data():
     """
-    TODO: Implement this presentation function.
+    Remove all books, users, transactions and index entries.
 
-    Should display a user's borrowed books in a formatted way.
-    Must use business logic layer functions only.
-    Look at test_presentation_layer_user_display() for requirements.
+    The stores are emptied in place so references to them stay valid.
     """
-    pass
-
-
-# --- TEST SUITE ---
-class TestDataAccessLayer(unittest.TestCase):
-    """
-    Tests for the Data Access Layer - lowest level, direct data operations.
-    These tests verify CRUD operations work correctly.
-    """
-
-    def setUp(self):
-        """Set up clean state before each test."""
-        clear_all_data()
-
-    def test_clear_all_data(self):
-        """Test that clear_all_data removes all data."""
-        # Add some test data first
-        global books_db, users_db, transactions_db
-        books_db[1] = {"title": "Test"}
-        users_db["user1"] = [1]
-        transactions_db.append({"test": "data"})
-
-        # Clear all data
-        clear_all_data()
-
-        # All should be empty
-        self.assertEqual(len(books_db), 0)
-        self.assertEqual(len(users_db), 0)
-        self.assertEqual(len(transactions_db), 0)
-
-    def test_data_layer_get_all_books(self):
-        """Test get_all_books returns correct data structure."""
-        # Should return empty dict when no books
-        result = get_all_books()
-        self.assertEqual(result, {})
-        self.assertIsInstance(result, dict)
-
-        # Add a book directly to test
-        books_db[1] = {"title": "Test Book", "author": "Test Author", "available_copies": 1}
+    global _next_book_id, _indexes_stale
+    with _write_lock:
+        books_db.clear()
+        users_db.clear()
+        transactions_db.clear()
+        _batch.pending.clear()
+        _available_book_ids.clear()
+        del _available_copies[:]
+        _copies_slot.clear()
+        _isbn_index.clear()
+        _book_isbns.clear()
+        _next_book_id = 1
+        _indexes_stale = False
 
-        # Should return the book
-        result = get_all_books()
-        self.assertEqual(len(result), 1)
-        self.assertIn(1, result)
-        self.assertEqual(result[1]["title"], "Test Book")
 
-    def test_data_layer_get_book_by_id(self):
-        """Test get_book_by_id returns correct book or None."""
-        # Should return None for non-existent book
-        result = get_book_by_id(999)
-        self.assertIsNone(result)
+# --- BUSINESS LOGIC LAYER ---
+# This layer contains all business rules and workflows
+# It should ONLY call data access layer functions (not directly access global data)
+# It should NOT handle user input/output (that's presentation layer)
 
-        # Add a book
-        books_db[1] = {"title": "Test Book", "author": "Test Author"}
+# Error messages, shared module-wide instead of rebuilt on each failure
+_ERR_EMPTY_TITLE = sys.intern("Error: Book title cannot be empty")
+_ERR_EMPTY_AUTHOR = sys.intern("Error: Author cannot be empty")
+_ERR_TOO_FEW_COPIES = sys.intern("Error: Number of copies must be at least 1")
+_ERR_NOT_AVAILABLE = sys.intern("Error: Book not available")
+_ERR_ALREADY_BORROWED = sys.intern("Error: Book already borrowed by this user")
+_ERR_NOT_BORROWED = sys.intern("Error: Book not borrowed by this user")
+_ERR_BOOK_NOT_FOUND = sys.intern("Error: Book not found")
 
-        # Should return the book
-        result = get_book_by_id(1)
-        self.assertIsNotNone(result)
-        self.assertEqual(result["title"], "Test Book")
+# Striped locks for the check-then-update steps of the workflows. Workflows
+# for different users and books take different locks, so they can run in
+# parallel on a free-threaded build; the same user or book is serialized.
+_LOCK_STRIPES = 16
+_user_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+_book_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+# New books are numbered and ISBN-checked one at a time
+_catalog_lock = threading.Lock()
 
-        # Should still return None for different ID
-        result = get_book_by_id(2)
-        self.assertIsNone(result)
 
-    def test_data_layer_save_book(self):
-        """Test save_book stores book data correctly."""
-        book_data = {
-            "title": "New Book",
-            "author": "New Author",
-            "isbn": "123456789",
-            "total_copies": 2,
-            "available_copies": 2
-        }
-
-        # Save the book
-        save_book(1, book_data)
-
-        # Should be stored in database
-        self.assertIn(1, books_db)
-        self.assertEqual(books_db[1]["title"], "New Book")
-        self.assertEqual(books_db[1]["total_copies"], 2)
-
-        # Should be able to update existing book
-        updated_data = book_data.copy()
-        updated_data["available_copies"] = 1
-        save_book(1, updated_data)
-
-        self.assertEqual(books_db[1]["available_copies"], 1)
-
-    def test_data_layer_user_books(self):
-        """Test user borrowed books operations."""
-        # Initially should return empty list
-        result = get_user_borrowed_books("user1")
-        self.assertEqual(result, [])
-
-        # Save a borrowed book
-        save_user_borrowed_book("user1", 1)
-        save_user_borrowed_book("user1", 2)
-
-        # Should return list of borrowed books
-        result = get_user_borrowed_books("user1")
-        self.assertEqual(len(result), 2)
-        self.assertIn(1, result)
-        self.assertIn(2, result)
-
-        # Remove a borrowed book
-        remove_user_borrowed_book("user1", 1)
-
-        # Should have one less book
-        result = get_user_borrowed_books("user1")
-        self.assertEqual(len(result), 1)
-        self.assertIn(2, result)
-        self.assertNotIn(1, result)
-
-    def test_data_layer_transactions(self):
-        """Test transaction logging."""
-        # Log a transaction
-        log_transaction("user1", 1, "borrow", "2024-01-01T10:00:00")
-
-        # Should be stored
-        self.assertEqual(len(transactions_db), 1)
-        transaction = transactions_db[0]
-        self.assertEqual(transaction["user_id"], "user1")
-        self.assertEqual(transaction["book_id"], 1)
-        self.assertEqual(transaction["action"], "borrow")
-        self.assertEqual(transaction["timestamp"], "2024-01-01T10:00:00")
-
-        # Log another transaction
-        log_transaction("user2", 2, "return", "2024-01-01T11:00:00")
-
-        # Should have two transactions
-        self.assertEqual(len(transactions_db), 2)
-
-
-class TestBusinessLogicLayer(unittest.TestCase):
-    """
-    Tests for the Business Logic Layer - core application rules.
-    These tests verify business workflows and rules are correctly implemented.
-    """
-
-    def setUp(self):
-        """Set up clean state before each test."""
-        clear_all_data()
-
-    def test_business_layer_add_book(self):
-        """Test add_book_to_library creates book with correct structure."""
-        result = add_book_to_library("Test Book", "Test Author", "123456789", 2)
-
-        # Should return success message
-        self.assertIsInstance(result, str)
-        self.assertIn("added", result.lower())
-
-        # Should create book with correct structure
-        books = get_all_books()
-        self.assertEqual(len(books), 1)
-
-        book_id = list(books.keys())[0]
-        book = books[book_id]
-        self.assertEqual(book["title"], "Test Book")
-        self.assertEqual(book["author"], "Test Author")
-        self.assertEqual(book["isbn"], "123456789")
-        self.assertEqual(book["total_copies"], 2)
-        self.assertEqual(book["available_copies"], 2)
-
-    def test_business_layer_add_book_validation(self):
-        """Test add_book_to_library validates input."""
-        # Should reject empty title
-        result = add_book_to_library("", "Author", "123456789")
-        self.assertIn("error", result.lower())
-
-        # Should reject empty author
-        result = add_book_to_library("Title", "", "123456789")
-        self.assertIn("error", result.lower())
+def _workflow_locks(user_id, book_id):
+    """Return the (user, book) locks to hold, always taken in that order."""
+    return (_user_locks[hash(user_id) % _LOCK_STRIPES],
+            _book_locks[hash(book_id) % _LOCK_STRIPES])
 
-        # Should reject invalid copies
-        result = add_book_to_library("Title", "Author", "123456789", 0)
-        self.assertIn("error", result.lower())
-
-    def test_business_layer_availability(self):
-        """Test is_book_available_for_borrowing checks correctly."""
-        # Non-existent book should not be available
-        self.assertFalse(is_book_available_for_borrowing(999))
-
-        # Add a book with available copies
-        add_book_to_library("Available Book", "Author", "123456789", 2)
-        book_id = list(get_all_books().keys())[0]
 
-        # Should be available
-        self.assertTrue(is_book_available_for_borrowing(book_id))
-
-        # Manually set available copies to 0
-        book = get_book_by_id(book_id)
-        book["available_copies"] = 0
-        save_book(book_id, book)
+def _with_copies_changed(book, change):
+    """
+    Return a copy of a book record with available_copies moved by `change`.
+
+    The stored record is left alone; save_book() then swaps in the copy and
+    updates the indexes under one lock, so readers never see them disagree.
+    """
+    copies = book["available_copies"] + change
+    if type(book) is Book:
+        return replace(book, available_copies=copies)
+    return {**book, "available_copies": copies}
 
-        # Should not be available
-        self.assertFalse(is_book_available_for_borrowing(book_id))
 
-    def test_business_layer_borrow(self):
-        """Test borrow_book_workflow handles borrowing correctly."""
-        # Add a book
-        add_book_to_library("Borrowable Book", "Author", "123456789", 1)
-        book_id = list(get_all_books().keys())[0]
+def add_book_to_library(title, author, isbn, copies=1):
+    """
+    Validate and add a new book, returning a success or error message.
+
+    Title and author must be non-empty, copies a positive int, and a
+    non-empty ISBN must not be in the catalog yet.
+    """
+    # Title and author are each stripped only once
+    title = title.strip() if title else ""
+    if not title:
+        return _ERR_EMPTY_TITLE
+    author = author.strip() if author else ""
+    if not author:
+        return _ERR_EMPTY_AUTHOR
+    if type(copies) is not int or copies < 1:
+        return _ERR_TOO_FEW_COPIES
+    isbn = isbn.strip() if isbn else ""
+    with _catalog_lock:
+        if isbn and get_book_id_by_isbn(isbn) is not None:
+            return f"Error: A book with ISBN {isbn} already exists"
+        book_id = get_next_book_id()
+        save_book(book_id, Book(title, author, isbn, copies, copies))
+    return f"Book '{title}' added successfully with ID {book_id}"
 
-        # Should successfully borrow
-        result = borrow_book_workflow("user1", book_id)
-        self.assertIn("borrowed", result.lower())
-        self.assertIn("successfully", result.lower())
 
-        # Book should have fewer available copies
+def is_book_available_for_borrowing(book_id):
+    """Return True if the book exists and has a copy available."""
+    book = get_book_by_id(book_id)
+    return book is not None and book["available_copies"] > 0
+
+
+def borrow_book_workflow(user_id, book_id):
+    """
+    Lend a book to a user and return a success or error message.
+
+    Checks availability and that the user doesn't already have the book,
+    then saves the updated book, the borrow record and the transaction.
+    """
+    user_lock, book_lock = _workflow_locks(user_id, book_id)
+    with user_lock, book_lock:
+        # Fetched once: the availability check and the update share the record
         book = get_book_by_id(book_id)
-        self.assertEqual(book["available_copies"], 0)
+        if book is None or book["available_copies"] <= 0:
+            return _ERR_NOT_AVAILABLE
+        if has_user_borrowed_book(user_id, book_id):
+            return _ERR_ALREADY_BORROWED
 
-        # User should have the book in their list
-        user_books = get_user_borrowed_books("user1")
-        self.assertIn(book_id, user_books)
+        book = _with_copies_changed(book, -1)
+        with transaction_batch():
+            save_book(book_id, book)
+            save_user_borrowed_book(user_id, book_id)
+            log_transaction(user_id, book_id, "borrow", time.time_ns())
+    return f"Book '{book['title']}' borrowed successfully!"
 
-        # Should not be able to borrow the same book again
-        result = borrow_book_workflow("user1", book_id)
-        self.assertIn("not available", result.lower())
 
-    def test_business_layer_return(self):
-        """Test return_book_workflow handles returns correctly."""
-        # Add and borrow a book first
-        add_book_to_library("Returnable Book", "Author", "123456789", 1)
-        book_id = list(get_all_books().keys())[0]
-        borrow_book_workflow("user1", book_id)
+def return_book_workflow(user_id, book_id):
+    """
+    Take a book back from a user and return a success or error message.
 
-        # Should successfully return
-        result = return_book_workflow("user1", book_id)
-        self.assertIn("returned", result.lower())
-        self.assertIn("successfully", result.lower())
+    The user must have the book borrowed; the updated book, the removed
+    borrow record and the transaction are then saved together.
+    """
+    user_lock, book_lock = _workflow_locks(user_id, book_id)
+    with user_lock, book_lock:
+        if not has_user_borrowed_book(user_id, book_id):
+            return _ERR_NOT_BORROWED
 
-        # Book should have more available copies
         book = get_book_by_id(book_id)
-        self.assertEqual(book["available_copies"], 1)
-
-        # User should not have the book in their list
-        user_books = get_user_borrowed_books("user1")
-        self.assertNotIn(book_id, user_books)
+        if book is None:
+            # Borrow records may outlive their book; there are no copies to put back
+            return _ERR_BOOK_NOT_FOUND
+        book = _with_copies_changed(book, 1)
+        with transaction_batch():
+            save_book(book_id, book)
+            remove_user_borrowed_book(user_id, book_id)
+            log_transaction(user_id, book_id, "return", time.time_ns())
+    return f"Book '{book['title']}' returned successfully!"
 
-        # Should not be able to return the same book again
-        result = return_book_workflow("user1", book_id)
-        self.assertIn("not borrowed", result.lower())
 
-    def test_business_layer_user_details(self):
-        """Test get_user_borrowed_books_with_details returns enriched data."""
-        # Add books and have user borrow them
-        add_book_to_library("Book One", "Author One", "111111111", 1)
-        add_book_to_library("Book Two", "Author Two", "222222222", 1)
+def get_user_borrowed_books_with_details(user_id):
+    """
+    Return the book ID, title and author of each book a user has borrowed.
 
-        books = get_all_books()
-        book_ids = list(books.keys())
+    Borrow records whose book is no longer in the catalog are skipped.
+    """
+    books = get_books_view()
+    # Item access, so records saved as plain dicts work as well as Books
+    return [{"book_id": book_id, "title": book["title"], "author": book["author"]}
+            for book_id in get_user_borrowed_books(user_id)
+            if (book := books.get(book_id)) is not None]
 
-        borrow_book_workflow("user1", book_ids[0])
-        borrow_book_workflow("user1", book_ids[1])
 
-        # Should return detailed information
-        result = get_user_borrowed_books_with_details("user1")
-        self.assertEqual(len(result), 2)
+def get_available_books_list():
+    """Return every book with a copy available, in book ID order."""
+    books = get_books_view()
+    return [{"book_id": book_id, **books[book_id]} for book_id in get_available_book_ids()]
 
-        # Each item should have book details
-        for item in result:
-            self.assertIn("book_id", item)
-            self.assertIn("title", item)
-            self.assertIn("author", item)
 
-    def test_business_layer_available_books(self):
-        """Test get_available_books_list returns only available books."""
-        # Add books with different availability
-        add_book_to_library("Available Book", "Author", "111111111", 2)
-        add_book_to_library("Unavailable Book", "Author", "222222222", 1)
+def get_availability_histogram():
+    """
+    Return how many books have each number of available copies.
 
-        books = get_all_books()
-        book_ids = list(books.keys())
+    Maps available_copies -> number of books, e.g. {0: 3, 2: 5}.
+    """
+    return dict(Counter(get_available_copies_column()))
 
-        # Borrow one copy of the unavailable book
-        borrow_book_workflow("user1", book_ids[1])
 
-        # Should return only available books
-        available = get_available_books_list()
-        available_titles = [book["title"] for book in available]
+# --- PRESENTATION LAYER ---
+# This layer handles user interface, input validation, and output formatting
+# It should ONLY call business logic layer functions (not data access directly)
 
-        self.assertIn("Available Book", available_titles)
-        self.assertNotIn("Unavailable Book", available_titles)
+# Line templates, bound once so formatting doesn't look them up per book
+_BORROWED_LINE = "  [{book_id}] {title} by {author}".format_map
+_CATALOG_HEADER = "📚 Library Books:\n" + "=" * 60
 
 
-class TestPresentationLayer(unittest.TestCase):
+def format_book_display(books_list):
     """
-    Tests for the Presentation Layer - user interface and formatting.
-    These tests verify proper formatting and input handling.
+    Format a list of books as a catalog listing for display.
+
+    Missing fields are shown with placeholders.
     """
+    # One f-string per book and one join over all lines
+    # Missing fields fall back to placeholders instead of raising
+    rows = [
+        f"[{book.get('book_id', 'N/A')}] {book.get('title', 'Unknown Title')} "
+        f"by {book.get('author', 'Unknown Author')} - "
+        + (f"✅ {copies} available" if (copies := book.get("available_copies", 0)) > 0
+           else "❌ Not available")
+        for book in books_list
+    ]
+    return "\n".join([_CATALOG_HEADER, *rows])
 
-    def setUp(self):
-        """Set up clean state before each test."""
-        clear_all_data()
 
-    def test_presentation_layer_formatting(self):
-        """Test format_book_display creates proper user-friendly output."""
-        books = [
-            {"book_id": 1, "title": "Book One", "author": "Author One", "available_copies": 2},
-            {"book_id": 2, "title": "Book Two", "author": "Author Two", "available_copies": 0}
-        ]
+def format_timestamp(timestamp_ns):
+    """Format a transaction timestamp (nanoseconds since the epoch) as ISO 8601."""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
 
-        result = format_book_display(books)
 
-        # Should return a string
-        self.assertIsInstance(result, str)
+# Menu choices and IDs repeat a lot, so remember recent conversions
+@lru_cache(maxsize=1024)
+def _parse_int_cached(input_string):
+    try:
+        return int(input_string.strip())
+    except (ValueError, AttributeError, TypeError):
+        return None
 
-        # Should contain book information
-        self.assertIn("Book One", result)
-        self.assertIn("Author One", result)
-        self.assertIn("Book Two", result)
 
-        # Should indicate availability
-        self.assertIn("available", result.lower())
+def _parse_int(input_string):
+    # Only strings reach the cache: None and unhashable input would break it
+    if type(input_string) is not str:
+        return None
+    return _parse_int_cached(input_string)
 
-    def test_presentation_layer_input_parsing(self):
-        """Test parse_user_input handles different input types."""
-        # Should parse integers
-        result = parse_user_input("123", int)
-        self.assertEqual(result, 123)
 
-        # Should parse strings
-        result = parse_user_input("test string", str)
-        self.assertEqual(result, "test string")
+def _parse_str(input_string):
+    return input_string.strip() if type(input_string) is str else None
 
-        # Should handle invalid integer input
-        result = parse_user_input("not a number", int)
-        self.assertIsNone(result)
 
-        # Should strip whitespace
-        result = parse_user_input("  test  ", str)
-        self.assertEqual(result, "test")
+# Parser for each supported input type; unknown types parse to None
+_INPUT_PARSERS = {int: _parse_int, str: _parse_str}
 
-    def test_presentation_layer_user_display(self):
-        """Test display_user_borrowed_books formats user data correctly."""
-        # Add and borrow books
-        add_book_to_library("User Book", "Author", "123456789", 1)
-        book_id = list(get_all_books().keys())[0]
-        borrow_book_workflow("user1", book_id)
-
-        # Should return formatted string
-        result = display_user_borrowed_books("user1")
-        self.assertIsInstance(result, str)
-        self.assertIn("User Book", result)
-        self.assertIn("Author", result)
-
-        # Should handle user with no books
-        result = display_user_borrowed_books("user_with_no_books")
-        self.assertIsInstance(result, str)
-        self.assertIn("no books", result.lower())
-
-
-class TestLayeredArchitecture(unittest.TestCase):
-    """
-    Tests that verify proper layered architecture implementation.
-    These tests ensure layers are properly separated and communicate correctly.
-    """
-
-    def setUp(self):
-        """Set up clean state before each test."""
-        clear_all_data()
-
-    def test_layer_separation_business_uses_data_only(self):
-        """Test that business layer functions only call data layer functions."""
-        # This is more of a code review test, but we can test behavior
-        # Business layer should not directly access global variables
-
-        # Add a book using business layer
-        add_book_to_library("Test Book", "Test Author", "123456789", 1)
 
-        # The book should be accessible through data layer
-        books = get_all_books()
-        self.assertEqual(len(books), 1)
+def parse_user_input(input_string, expected_type):
+    """Parse user input as expected_type, returning None if it doesn't parse."""
+    parser = _INPUT_PARSERS.get(expected_type)
+    return None if parser is None else parser(input_string)
 
-        # Business layer operations should work through data layer
-        book_id = list(books.keys())[0]
-        available = is_book_available_for_borrowing(book_id)
-        self.assertTrue(available)
-
-    def test_complete_workflow_through_layers(self):
-        """Test a complete workflow that goes through all layers."""
-        # Data layer: Add book directly to test data flow
-        save_book(1, {
-            "title": "Workflow Book",
-            "author": "Workflow Author",
-            "isbn": "999999999",
-            "total_copies": 1,
-            "available_copies": 1
-        })
-
-        # Business layer: Check availability and borrow
-        self.assertTrue(is_book_available_for_borrowing(1))
-        result = borrow_book_workflow("workflow_user", 1)
-        self.assertIn("successfully", result.lower())
-
-        # Presentation layer: Display user's books
-        display_result = display_user_borrowed_books("workflow_user")
-        self.assertIn("Workflow Book", display_result)
-
-        # Business layer: Return the book
-        return_result = return_book_workflow("workflow_user", 1)
-        self.assertIn("successfully", return_result.lower())
-
-        # Verify final state through data layer
-        self.assertTrue(is_book_available_for_borrowing(1))
-
-
-def run_tests():
-    """
-    Run all tests and provide detailed feedback for layered architecture.
-    """
-    print("🧪 Running Test Suite for Layered Architecture Library System")
-    print("=" * 70)
-    print()
-    print("These tests verify proper layered architecture implementation:")
-    print("📊 DATA ACCESS LAYER: Direct database operations")
-    print("🧠 BUSINESS LOGIC LAYER: Application rules and workflows")
-    print("🖥️  PRESENTATION LAYER: User interface and formatting")
-    print("🏗️  ARCHITECTURE TESTS: Layer separation and communication")
-    print()
-
-    # Run tests with detailed output
-    test_loader = unittest.TestLoader()
-    test_suite = test_loader.loadTestsFromModule(sys.modules[__name__])
-
-    runner = unittest.TextTestRunner(verbosity=2, stream=sys.stdout)
-    result = runner.run(test_suite)
-
-    print("\n" + "=" * 70)
-    if result.wasSuccessful():
-        print("🎉 Congratulations! All tests pass!")
-        print("Your layered architecture implementation is complete!")
-        print()
-        print("🏗️  Layered Architecture Characteristics Demonstrated:")
-        print("✅ Clear separation of concerns")
-        print("✅ Each layer has specific responsibilities")
-        print("✅ Controlled communication between layers")
-        print("✅ Business logic isolated from data and UI")
-        print("✅ Easier to test and maintain")
-    else:
-        print(f"❌ {len(result.failures)} test(s) failed, {len(result.errors)} error(s)")
-        print()
-        print("💡 Tips for layered architecture success:")
-        print("1. Data layer: Only CRUD operations, no business logic")
-        print("2. Business layer: Only call data layer functions")
-        print("3. Presentation layer: Only call business layer functions")
-        print("4. Each layer should have a single responsibility")
-        print("5. Test each layer independently")
-        print()
-        print("Start with the data access layer functions first!")
-
-    return result.wasSuccessful()
-
-
-if __name__ == "__main__":
-    print("🎯 Layered Architecture - Test-Driven Development Exercise")
-    print()
-    print("📚 Layer Responsibilities:")
-    print("📊 DATA ACCESS: get_all_books(), save_book(), log_transaction(), etc.")
-    print("🧠 BUSINESS LOGIC: add_book_to_library(), borrow_book_workflow(), etc.")
-    print("🖥️  PRESENTATION: format_book_display(), parse_user_input(), etc.")
-    print()
-
-    # Run the tests
-    success = run_tests()
-
-    if not success:
-        print("\n🚀 Implementation Strategy:")
-        print("1. Start with Data Access Layer (simplest CRUD operations)")
-        print("2. Move to Business Logic Layer (use only data access functions)")
-        print("3. Finish with Presentation Layer (use only business logic functions)")
-        print("4. Run tests frequently to verify layer separation")
-        print()
-        print("Remember: Each layer should only communicate with adjacent layers!")
\ No newline at end of file
+
+def display_user_borrowed_books(user_id):
+    """Return a user's borrowed books as display text."""
+    books = get_user_borrowed_books_with_details(user_id)
+    if not books:
+        return f"User {user_id} has no books borrowed."
+
+    return "\n".join([f"Books borrowed by {user_id}:", *map(_BORROWED_LINE, books)])
@@ -0,0 +1,765 @@
+"""
+Test Suite for the Layered Library Management System (Test-Driven Development)
+=============================================================================
+
+These tests define the requirements for library_management.py, layer by layer.
+They live in their own module so that importing library_management doesn't
+pull in unittest.
+
+Run them with:
+    python3 test_library_management.py
+"""
+
+import unittest
+import sys
+import threading
+from datetime import datetime
+
+from library_management import (
+    Book,
+    books_db,
+    users_db,
+    transactions_db,
+    _TX_FLUSH_SIZE,
+    get_all_books,
+    get_books_view,
+    get_book_by_id,
+    save_book,
+    get_book_id_by_isbn,
+    get_next_book_id,
+    get_user_borrowed_books,
+    has_user_borrowed_book,
+    save_user_borrowed_book,
+    remove_user_borrowed_book,
+    log_transaction,
+    transaction_batch,
+    clear_all_data,
+    add_book_to_library,
+    is_book_available_for_borrowing,
+    borrow_book_workflow,
+    return_book_workflow,
+    get_user_borrowed_books_with_details,
+    get_available_books_list,
+    get_availability_histogram,
+    format_book_display,
+    format_timestamp,
+    parse_user_input,
+    display_user_borrowed_books,
+)
+
+
+# --- TEST SUITE ---
+class TestDataAccessLayer(unittest.TestCase):
+    """
+    Tests for the Data Access Layer - lowest level, direct data operations.
+    These tests verify CRUD operations work correctly.
+    """
+
+    def setUp(self):
+        """Set up clean state before each test."""
+        clear_all_data()
+
+    def test_clear_all_data(self):
+        """Test that clear_all_data removes all data."""
+        # Add some test data first
+        global books_db, users_db, transactions_db
+        books_db[1] = {"title": "Test"}
+        users_db["user1"] = [1]
+        transactions_db.append({"test": "data"})
+
+        # Clear all data
+        clear_all_data()
+
+        # All should be empty
+        self.assertEqual(len(books_db), 0)
+        self.assertEqual(len(users_db), 0)
+        self.assertEqual(len(transactions_db), 0)
+
+    def test_clear_all_data_keeps_stores(self):
+        """Test clear_all_data empties the stores in place instead of replacing them."""
+        stores = (books_db, users_db, transactions_db)
+        view = get_books_view()
+        add_book_to_library("Test Book", "Test Author", "123456789", 1)
+
+        clear_all_data()
+
+        # Same objects, so existing references and views stay valid
+        self.assertIs(stores[0], books_db)
+        self.assertIs(stores[1], users_db)
+        self.assertIs(stores[2], transactions_db)
+        self.assertEqual(len(view), 0)
+
+        add_book_to_library("Another Book", "Test Author", "987654321", 1)
+        self.assertEqual(len(view), 1)
+
+    def test_data_layer_get_all_books(self):
+        """Test get_all_books returns correct data structure."""
+        # Should return empty dict when no books
+        result = get_all_books()
+        self.assertEqual(result, {})
+        self.assertIsInstance(result, dict)
+
+        # Add a book directly to test
+        books_db[1] = {"title": "Test Book", "author": "Test Author", "available_copies": 1}
+
+        # Should return the book
+        result = get_all_books()
+        self.assertEqual(len(result), 1)
+        self.assertIn(1, result)
+        self.assertEqual(result[1]["title"], "Test Book")
+
+    def test_data_layer_direct_writes_are_indexed(self):
+        """Test books written straight into books_db still show up in indexed queries."""
+        books_db[3] = {"title": "Direct Book", "author": "Author", "isbn": "123456789",
+                       "total_copies": 2, "available_copies": 2}
+
+        self.assertEqual([book["book_id"] for book in get_available_books_list()], [3])
+        self.assertEqual(get_book_id_by_isbn("123456789"), 3)
+        self.assertEqual(get_next_book_id(), 4)
+        self.assertIn("error", add_book_to_library("Copy", "Author", "123456789", 1).lower())
+
+        del books_db[3]
+        self.assertEqual(get_available_books_list(), [])
+        self.assertIsNone(get_book_id_by_isbn("123456789"))
+
+    def test_data_layer_books_view(self):
+        """Test get_books_view is a live, read-only view of the books."""
+        view = get_books_view()
+        self.assertIs(get_books_view(), view)
+
+        save_book(1, {"title": "Test Book", "author": "Test Author", "isbn": "123456789",
+                      "total_copies": 1, "available_copies": 1})
+        self.assertEqual(view[1]["title"], "Test Book")
+
+        with self.assertRaises(TypeError):
+            view[2] = {"title": "Sneaky Book"}
+
+    def test_data_layer_get_book_by_id(self):
+        """Test get_book_by_id returns correct book or None."""
+        # Should return None for non-existent book
+        result = get_book_by_id(999)
+        self.assertIsNone(result)
+
+        # Add a book
+        books_db[1] = {"title": "Test Book", "author": "Test Author"}
+
+        # Should return the book
+        result = get_book_by_id(1)
+        self.assertIsNotNone(result)
+        self.assertEqual(result["title"], "Test Book")
+
+        # Should still return None for different ID
+        result = get_book_by_id(2)
+        self.assertIsNone(result)
+
+    def test_data_layer_save_book(self):
+        """Test save_book stores book data correctly."""
+        book_data = {
+            "title": "New Book",
+            "author": "New Author",
+            "isbn": "123456789",
+            "total_copies": 2,
+            "available_copies": 2
+        }
+
+        # Save the book
+        save_book(1, book_data)
+
+        # Should be stored in database
+        self.assertIn(1, books_db)
+        self.assertEqual(books_db[1]["title"], "New Book")
+        self.assertEqual(books_db[1]["total_copies"], 2)
+
+        # Should be able to update existing book
+        updated_data = book_data.copy()
+        updated_data["available_copies"] = 1
+        save_book(1, updated_data)
+
+        self.assertEqual(books_db[1]["available_copies"], 1)
+
+    def test_data_layer_save_book_leaves_caller_record_alone(self):
+        """Test saving a Book doesn't rewrite fields of the caller's object."""
+        # Built at runtime so the strings aren't already interned
+        author = "".join(["Runtime ", "Author"])
+        isbn = "".join(["555", "000111"])
+        book = Book("Title", author, isbn, 1, 1)
+
+        save_book(1, book)
+
+        self.assertIs(book.author, author)
+        self.assertIs(book.isbn, isbn)
+        self.assertEqual(books_db[1]["author"], "Runtime Author")
+        self.assertIs(books_db[1]["author"], sys.intern("Runtime Author"))
+
+    def test_data_layer_user_books(self):
+        """Test user borrowed books operations."""
+        # Initially should return empty list
+        result = get_user_borrowed_books("user1")
+        self.assertEqual(result, [])
+
+        # Save a borrowed book
+        save_user_borrowed_book("user1", 1)
+        save_user_borrowed_book("user1", 2)
+
+        # Should return list of borrowed books
+        result = get_user_borrowed_books("user1")
+        self.assertEqual(len(result), 2)
+        self.assertIn(1, result)
+        self.assertIn(2, result)
+
+        # Remove a borrowed book
+        remove_user_borrowed_book("user1", 1)
+
+        # Should have one less book
+        result = get_user_borrowed_books("user1")
+        self.assertEqual(len(result), 1)
+        self.assertIn(2, result)
+        self.assertNotIn(1, result)
+
+        # The returned list is a snapshot; changing it doesn't touch the store
+        result.append(3)
+        self.assertEqual(get_user_borrowed_books("user1"), [2])
+
+        # Membership can be checked without fetching the list
+        self.assertTrue(has_user_borrowed_book("user1", 2))
+        self.assertFalse(has_user_borrowed_book("user1", 1))
+        self.assertFalse(has_user_borrowed_book("unknown_user", 2))
+
+    def test_data_layer_transactions(self):
+        """Test transaction logging."""
+        # Log a transaction
+        log_transaction("user1", 1, "borrow", "2024-01-01T10:00:00")
+
+        # Should be stored
+        self.assertEqual(len(transactions_db), 1)
+        transaction = transactions_db[0]
+        self.assertEqual(transaction["user_id"], "user1")
+        self.assertEqual(transaction["book_id"], 1)
+        self.assertEqual(transaction["action"], "borrow")
+        # ISO timestamps are stored as nanoseconds, like the workflows' time.time_ns()
+        self.assertIsInstance(transaction["timestamp"], int)
+        self.assertEqual(format_timestamp(transaction["timestamp"]), "2024-01-01T10:00:00")
+
+        # Log another transaction
+        log_transaction("user2", 2, "return", "2024-01-01T11:00:00")
+
+        # Should have two transactions
+        self.assertEqual(len(transactions_db), 2)
+
+    def test_data_layer_next_book_id(self):
+        """Test new book IDs skip past IDs that were saved directly."""
+        self.assertEqual(get_next_book_id(), 1)
+
+        save_book(5, {"title": "Saved Book", "author": "Author", "isbn": "123456789",
+                      "total_copies": 1, "available_copies": 1})
+        self.assertEqual(get_next_book_id(), 6)
+
+        result = add_book_to_library("Added Book", "Author", "987654321", 1)
+        self.assertIn("ID 6", result)
+        self.assertEqual(books_db[5]["title"], "Saved Book")
+
+    def test_data_layer_transaction_batch(self):
+        """Test transactions logged in a batch are written when it ends."""
+        with transaction_batch():
+            log_transaction("user1", 1, "borrow", "2024-01-01T10:00:00")
+            with transaction_batch():
+                log_transaction("user1", 1, "return", "2024-01-01T11:00:00")
+            # Nothing is written until the outermost batch ends
+            self.assertEqual(len(transactions_db), 0)
+
+        self.assertEqual(len(transactions_db), 2)
+        self.assertEqual([t["action"] for t in transactions_db], ["borrow", "return"])
+
+    def test_data_layer_transaction_batch_flushes_when_full(self):
+        """Test a long batch writes its buffer out once it reaches the flush size."""
+        with transaction_batch():
+            for i in range(_TX_FLUSH_SIZE + 1):
+                log_transaction("user1", i, "borrow", "2024-01-01T10:00:00")
+            self.assertEqual(len(transactions_db), _TX_FLUSH_SIZE)
+
+        self.assertEqual(len(transactions_db), _TX_FLUSH_SIZE + 1)
+
+    def test_data_layer_transaction_batch_is_per_thread(self):
+        """Test one thread's open batch doesn't hold back another thread's log calls."""
+        batch_open = threading.Event()
+        release = threading.Event()
+
+        def hold_batch():
+            with transaction_batch():
+                log_transaction("user1", 1, "borrow", 1)
+                batch_open.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold_batch)
+        holder.start()
+        batch_open.wait(5)
+        try:
+            log_transaction("user2", 2, "return", 2)
+            self.assertEqual([t["user_id"] for t in transactions_db], ["user2"])
+        finally:
+            release.set()
+            holder.join()
+        self.assertEqual(len(transactions_db), 2)
+
+
+class TestBusinessLogicLayer(unittest.TestCase):
+    """
+    Tests for the Business Logic Layer - core application rules.
+    These tests verify business workflows and rules are correctly implemented.
+    """
+
+    def setUp(self):
+        """Set up clean state before each test."""
+        clear_all_data()
+
+    def test_business_layer_add_book(self):
+        """Test add_book_to_library creates book with correct structure."""
+        result = add_book_to_library("Test Book", "Test Author", "123456789", 2)
+
+        # Should return success message
+        self.assertIsInstance(result, str)
+        self.assertIn("added", result.lower())
+
+        # Should create book with correct structure
+        books = get_all_books()
+        self.assertEqual(len(books), 1)
+
+        book_id = list(books.keys())[0]
+        book = books[book_id]
+        self.assertEqual(book["title"], "Test Book")
+        self.assertEqual(book["author"], "Test Author")
+        self.assertEqual(book["isbn"], "123456789")
+        self.assertEqual(book["total_copies"], 2)
+        self.assertEqual(book["available_copies"], 2)
+
+    def test_business_layer_add_book_validation(self):
+        """Test add_book_to_library validates input."""
+        # Should reject empty title
+        result = add_book_to_library("", "Author", "123456789")
+        self.assertIn("error", result.lower())
+
+        # Should reject empty author
+        result = add_book_to_library("Title", "", "123456789")
+        self.assertIn("error", result.lower())
+
+        # Should reject invalid copies
+        result = add_book_to_library("Title", "Author", "123456789", 0)
+        self.assertIn("error", result.lower())
+        result = add_book_to_library("Title", "Author", "123456789", "3")
+        self.assertIn("copies", result.lower())
+
+        # Errors are reported in field order: title, author, then copies
+        result = add_book_to_library("", "Author", "123456789", 0)
+        self.assertIn("title", result.lower())
+
+    def test_business_layer_add_book_duplicate_isbn(self):
+        """Test add_book_to_library rejects an ISBN that is already in the catalog."""
+        add_book_to_library("First Book", "Author", "123456789", 1)
+
+        result = add_book_to_library("Second Book", "Author", "123456789", 1)
+        self.assertIn("error", result.lower())
+        self.assertEqual(len(get_all_books()), 1)
+        self.assertEqual(get_book_id_by_isbn("123456789"), 1)
+
+        # The old ISBN is released when a book is saved with a new one
+        book = get_book_by_id(1)
+        book["isbn"] = "987654321"
+        save_book(1, book)
+        self.assertIsNone(get_book_id_by_isbn("123456789"))
+        self.assertIn("added", add_book_to_library("Second Book", "Author", "123456789", 1))
+
+        # Books without an ISBN never clash with each other
+        self.assertIn("added", add_book_to_library("No ISBN", "Author", "", 1))
+        self.assertIn("added", add_book_to_library("Also No ISBN", "Author", None, 1))
+        self.assertIn("added", add_book_to_library("Blank ISBN", "Author", "  ", 1))
+        self.assertIsNone(get_book_id_by_isbn(""))
+
+    def test_business_layer_availability(self):
+        """Test is_book_available_for_borrowing checks correctly."""
+        # Non-existent book should not be available
+        self.assertFalse(is_book_available_for_borrowing(999))
+
+        # Add a book with available copies
+        add_book_to_library("Available Book", "Author", "123456789", 2)
+        book_id = list(get_all_books().keys())[0]
+
+        # Should be available
+        self.assertTrue(is_book_available_for_borrowing(book_id))
+
+        # Manually set available copies to 0
+        book = get_book_by_id(book_id)
+        book["available_copies"] = 0
+        save_book(book_id, book)
+
+        # Should not be available
+        self.assertFalse(is_book_available_for_borrowing(book_id))
+
+    def test_business_layer_dict_records(self):
+        """Test the workflows accept book records stored as plain dicts."""
+        books_db["B9"] = {"title": "Dict Book", "author": "Author", "isbn": "123456789",
+                          "total_copies": 1, "available_copies": 1}
+
+        self.assertTrue(is_book_available_for_borrowing("B9"))
+        self.assertIn("successfully", borrow_book_workflow("user1", "B9"))
+        self.assertEqual(get_user_borrowed_books_with_details("user1"),
+                         [{"book_id": "B9", "title": "Dict Book", "author": "Author"}])
+        self.assertIn("successfully", return_book_workflow("user1", "B9"))
+        self.assertEqual(get_book_by_id("B9")["available_copies"], 1)
+
+    def test_business_layer_borrow(self):
+        """Test borrow_book_workflow handles borrowing correctly."""
+        # Add a book
+        add_book_to_library("Borrowable Book", "Author", "123456789", 1)
+        book_id = list(get_all_books().keys())[0]
+
+        # Should successfully borrow
+        result = borrow_book_workflow("user1", book_id)
+        self.assertIn("borrowed", result.lower())
+        self.assertIn("successfully", result.lower())
+
+        # Book should have fewer available copies
+        book = get_book_by_id(book_id)
+        self.assertEqual(book["available_copies"], 0)
+
+        # User should have the book in their list
+        user_books = get_user_borrowed_books("user1")
+        self.assertIn(book_id, user_books)
+
+        # Should not be able to borrow the same book again
+        result = borrow_book_workflow("user1", book_id)
+        self.assertIn("not available", result.lower())
+
+    def test_business_layer_return(self):
+        """Test return_book_workflow handles returns correctly."""
+        # Add and borrow a book first
+        add_book_to_library("Returnable Book", "Author", "123456789", 1)
+        book_id = list(get_all_books().keys())[0]
+        borrow_book_workflow("user1", book_id)
+
+        # Should successfully return
+        result = return_book_workflow("user1", book_id)
+        self.assertIn("returned", result.lower())
+        self.assertIn("successfully", result.lower())
+
+        # Book should have more available copies
+        book = get_book_by_id(book_id)
+        self.assertEqual(book["available_copies"], 1)
+
+        # User should not have the book in their list
+        user_books = get_user_borrowed_books("user1")
+        self.assertNotIn(book_id, user_books)
+
+        # Should not be able to return the same book again
+        result = return_book_workflow("user1", book_id)
+        self.assertIn("not borrowed", result.lower())
+
+    def test_business_layer_return_missing_book(self):
+        """Test returning a borrowed book that left the catalog reports an error."""
+        save_user_borrowed_book("user1", 999)
+
+        result = return_book_workflow("user1", 999)
+        self.assertIn("not found", result.lower())
+        self.assertEqual(len(transactions_db), 0)
+
+    def test_business_layer_concurrent_borrows(self):
+        """Test concurrent borrows never hand out more copies than exist."""
+        add_book_to_library("Popular Book", "Author", "123456789", 5)
+
+        threads = [threading.Thread(target=borrow_book_workflow, args=(f"user{i}", 1))
+                   for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(get_book_by_id(1)["available_copies"], 0)
+        self.assertEqual(len(transactions_db), 5)
+
+    def test_business_layer_borrow_publishes_new_record(self):
+        """Test a borrow saves an updated copy instead of changing the stored record."""
+        add_book_to_library("Shared Book", "Author", "123456789", 2)
+        before = get_book_by_id(1)
+
+        borrow_book_workflow("user1", 1)
+
+        self.assertEqual(before["available_copies"], 2)
+        self.assertEqual(get_book_by_id(1)["available_copies"], 1)
+
+    def test_business_layer_user_details(self):
+        """Test get_user_borrowed_books_with_details returns enriched data."""
+        # Add books and have user borrow them
+        add_book_to_library("Book One", "Author One", "111111111", 1)
+        add_book_to_library("Book Two", "Author Two", "222222222", 1)
+
+        books = get_all_books()
+        book_ids = list(books.keys())
+
+        borrow_book_workflow("user1", book_ids[0])
+        borrow_book_workflow("user1", book_ids[1])
+
+        # Should return detailed information
+        result = get_user_borrowed_books_with_details("user1")
+        self.assertEqual(len(result), 2)
+
+        # Each item should have book details
+        for item in result:
+            self.assertIn("book_id", item)
+            self.assertIn("title", item)
+            self.assertIn("author", item)
+
+        # Borrow records for books no longer in the catalog are skipped
+        save_user_borrowed_book("user1", 999)
+        result = get_user_borrowed_books_with_details("user1")
+        self.assertEqual(len(result), 2)
+
+    def test_business_layer_available_books(self):
+        """Test get_available_books_list returns only available books."""
+        # Add books with different availability
+        add_book_to_library("Available Book", "Author", "111111111", 2)
+        add_book_to_library("Unavailable Book", "Author", "222222222", 1)
+
+        books = get_all_books()
+        book_ids = list(books.keys())
+
+        # Borrow one copy of the unavailable book
+        borrow_book_workflow("user1", book_ids[1])
+
+        # Should return only available books
+        available = get_available_books_list()
+        available_titles = [book["title"] for book in available]
+
+        self.assertIn("Available Book", available_titles)
+        self.assertNotIn("Unavailable Book", available_titles)
+
+    def test_business_layer_available_books_after_return(self):
+        """Test a returned book shows up as available again."""
+        add_book_to_library("Popular Book", "Author", "111111111", 1)
+        borrow_book_workflow("user1", 1)
+        self.assertEqual(get_available_books_list(), [])
+
+        return_book_workflow("user1", 1)
+        available = get_available_books_list()
+        self.assertEqual([book["book_id"] for book in available], [1])
+        self.assertEqual(available[0]["available_copies"], 1)
+
+    def test_business_layer_availability_histogram(self):
+        """Test get_availability_histogram counts books per available copies."""
+        self.assertEqual(get_availability_histogram(), {})
+
+        add_book_to_library("Book One", "Author", "111111111", 2)
+        add_book_to_library("Book Two", "Author", "222222222", 2)
+        add_book_to_library("Book Three", "Author", "333333333", 1)
+        borrow_book_workflow("user1", 3)
+
+        self.assertEqual(get_availability_histogram(), {2: 2, 0: 1})
+
+
+class TestPresentationLayer(unittest.TestCase):
+    """
+    Tests for the Presentation Layer - user interface and formatting.
+    These tests verify proper formatting and input handling.
+    """
+
+    def setUp(self):
+        """Set up clean state before each test."""
+        clear_all_data()
+
+    def test_presentation_layer_formatting(self):
+        """Test format_book_display creates proper user-friendly output."""
+        books = [
+            {"book_id": 1, "title": "Book One", "author": "Author One", "available_copies": 2},
+            {"book_id": 2, "title": "Book Two", "author": "Author Two", "available_copies": 0}
+        ]
+
+        result = format_book_display(books)
+
+        # Should return a string
+        self.assertIsInstance(result, str)
+
+        # Should contain book information
+        self.assertIn("Book One", result)
+        self.assertIn("Author One", result)
+        self.assertIn("Book Two", result)
+
+        # Should indicate availability
+        self.assertIn("available", result.lower())
+
+        # Records with missing fields are shown with placeholders
+        result = format_book_display([{"title": "T"}])
+        self.assertIn("[N/A] T by Unknown Author", result)
+        self.assertIn("Not available", result)
+
+    def test_presentation_layer_input_parsing(self):
+        """Test parse_user_input handles different input types."""
+        # Should parse integers
+        result = parse_user_input("123", int)
+        self.assertEqual(result, 123)
+
+        # Should parse strings
+        result = parse_user_input("test string", str)
+        self.assertEqual(result, "test string")
+
+        # Should handle invalid integer input
+        result = parse_user_input("not a number", int)
+        self.assertIsNone(result)
+
+        # Should strip whitespace
+        result = parse_user_input("  test  ", str)
+        self.assertEqual(result, "test")
+
+        # Missing or non-text input parses to None
+        self.assertIsNone(parse_user_input(None, int))
+        self.assertIsNone(parse_user_input(["1"], int))
+        self.assertIsNone(parse_user_input(None, str))
+
+    def test_presentation_layer_timestamp_formatting(self):
+        """Test format_timestamp turns logged timestamps into readable dates."""
+        add_book_to_library("Timed Book", "Author", "123456789", 1)
+        borrow_book_workflow("user1", 1)
+
+        result = format_timestamp(transactions_db[0]["timestamp"])
+        self.assertIsInstance(result, str)
+        elapsed = datetime.now() - datetime.fromisoformat(result)
+        self.assertLess(abs(elapsed.total_seconds()), 60)
+
+    def test_presentation_layer_user_display(self):
+        """Test display_user_borrowed_books formats user data correctly."""
+        # Add and borrow books
+        add_book_to_library("User Book", "Author", "123456789", 1)
+        book_id = list(get_all_books().keys())[0]
+        borrow_book_workflow("user1", book_id)
+
+        # Should return formatted string
+        result = display_user_borrowed_books("user1")
+        self.assertIsInstance(result, str)
+        self.assertIn("User Book", result)
+        self.assertIn("Author", result)
+
+        # Should handle user with no books
+        result = display_user_borrowed_books("user_with_no_books")
+        self.assertIsInstance(result, str)
+        self.assertIn("no books", result.lower())
+
+
+class TestLayeredArchitecture(unittest.TestCase):
+    """
+    Tests that verify proper layered architecture implementation.
+    These tests ensure layers are properly separated and communicate correctly.
+    """
+
+    def setUp(self):
+        """Set up clean state before each test."""
+        clear_all_data()
+
+    def test_layer_separation_business_uses_data_only(self):
+        """Test that business layer functions only call data layer functions."""
+        # This is more of a code review test, but we can test behavior
+        # Business layer should not directly access global variables
+
+        # Add a book using business layer
+        add_book_to_library("Test Book", "Test Author", "123456789", 1)
+
+        # The book should be accessible through data layer
+        books = get_all_books()
+        self.assertEqual(len(books), 1)
+
+        # Business layer operations should work through data layer
+        book_id = list(books.keys())[0]
+        available = is_book_available_for_borrowing(book_id)
+        self.assertTrue(available)
+
+    def test_complete_workflow_through_layers(self):
+        """Test a complete workflow that goes through all layers."""
+        # Data layer: Add book directly to test data flow
+        save_book(1, {
+            "title": "Workflow Book",
+            "author": "Workflow Author",
+            "isbn": "999999999",
+            "total_copies": 1,
+            "available_copies": 1
+        })
+
+        # Business layer: Check availability and borrow
+        self.assertTrue(is_book_available_for_borrowing(1))
+        result = borrow_book_workflow("workflow_user", 1)
+        self.assertIn("successfully", result.lower())
+
+        # Presentation layer: Display user's books
+        display_result = display_user_borrowed_books("workflow_user")
+        self.assertIn("Workflow Book", display_result)
+
+        # Business layer: Return the book
+        return_result = return_book_workflow("workflow_user", 1)
+        self.assertIn("successfully", return_result.lower())
+
+        # Verify final state through data layer
+        self.assertTrue(is_book_available_for_borrowing(1))
+
+
+def run_tests():
+    """
+    Run all tests and provide detailed feedback for layered architecture.
+    """
+    print("🧪 Running Test Suite for Layered Architecture Library System")
+    print("=" * 70)
+    print()
+    print("These tests verify proper layered architecture implementation:")
+    print("📊 DATA ACCESS LAYER: Direct database operations")
+    print("🧠 BUSINESS LOGIC LAYER: Application rules and workflows")
+    print("🖥️  PRESENTATION LAYER: User interface and formatting")
+    print("🏗️  ARCHITECTURE TESTS: Layer separation and communication")
+    print()
+
+    # Run tests with detailed output
+    test_loader = unittest.TestLoader()
+    test_suite = test_loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2, stream=sys.stdout)
+    result = runner.run(test_suite)
+
+    print("\n" + "=" * 70)
+    if result.wasSuccessful():
+        print("🎉 Congratulations! All tests pass!")
+        print("Your layered architecture implementation is complete!")
+        print()
+        print("🏗️  Layered Architecture Characteristics Demonstrated:")
+        print("✅ Clear separation of concerns")
+        print("✅ Each layer has specific responsibilities")
+        print("✅ Controlled communication between layers")
+        print("✅ Business logic isolated from data and UI")
+        print("✅ Easier to test and maintain")
+    else:
+        print(f"❌ {len(result.failures)} test(s) failed, {len(result.errors)} error(s)")
+        print()
+        print("💡 Tips for layered architecture success:")
+        print("1. Data layer: Only CRUD operations, no business logic")
+        print("2. Business layer: Only call data layer functions")
+        print("3. Presentation layer: Only call business layer functions")
+        print("4. Each layer should have a single responsibility")
+        print("5. Test each layer independently")
+        print()
+        print("Start with the data access layer functions first!")
+
+    return result.wasSuccessful()
+
+
+if __name__ == "__main__":
+    print("🎯 Layered Architecture - Test-Driven Development Exercise")
+    print()
+    print("📚 Layer Responsibilities:")
+    print("📊 DATA ACCESS: get_all_books(), save_book(), log_transaction(), etc.")
+    print("🧠 BUSINESS LOGIC: add_book_to_library(), borrow_book_workflow(), etc.")
+    print("🖥️  PRESENTATION: format_book_display(), parse_user_input(), etc.")
+    print()
+
+    # Run the tests
+    success = run_tests()
+
+    if not success:
+        print("\n🚀 Implementation Strategy:")
+        print("1. Start with Data Access Layer (simplest CRUD operations)")
+        print("2. Move to Business Logic Layer (use only data access functions)")
+        print("3. Finish with Presentation Layer (use only business logic functions)")
+        print("4. Run tests frequently to verify layer separation")
+        print()
+        print("Remember: Each layer should only communicate with adjacent layers!")
\ No newline at end of file
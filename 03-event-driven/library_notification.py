@@ -43,214 +43,604 @@ LEARNING OBJECTIVES:
 - Handle complex inter-service dependencies
 """
 
+import io
+import os
 import unittest
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, NamedTuple
 import sys
+import itertools
+import json
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 
 # --- GLOBAL STATE ---
 # Each service maintains its own state (simulating separate databases)
 library_db = {
     "books": {},
     "users": {},
-    "borrowings": {}
+    "borrowings": {},
+    "borrowings_by_user": defaultdict(dict),  # user_id -> {book_id: open borrowing}
+    "books_by_isbn": {},   # isbn -> book_id, for O(1) duplicate checks
+    "users_by_email": {}   # lowercased email -> user_id, for O(1) duplicate checks
 }
 
 notification_db = {
     "users": {},
-    "notifications": [],
+    "notifications": defaultdict(list),  # user_id -> that user's notifications
+    "by_user_and_type": defaultdict(list),  # (user_id, type) -> those notifications
     "preferences": {}
 }
 
 analytics_db = {
     "events": [],
+    # Compact columns over "events", filled by _index_analytics_events():
+    "event_tags": array("B"),  # per event, in list order: _EVENT_TAGS code
+    "event_ts": array("q"),    # timestamps in ns, sorted ascending
+    "event_pos": array("q"),   # position in "events" of each event_ts entry
+    "daily": {},    # date -> that day's borrows, returns, users and book counts
     "metrics": {},
     "reports": {}
 }
 
 audit_db = {
     "events": [],
-    "snapshots": {}
+    "snapshots": {},
+    "by_entity": defaultdict(list)  # (entity_type, entity_id) -> its audit events
 }
 
 # Message broker state
-event_queue = []
-event_handlers = {}
-failed_events = []
+event_queue = deque()  # FIFO; popleft() is O(1), unlike list.pop(0)
+event_handlers = {}    # event_type -> tuple of (handler_func, service_name)
+bulk_handlers = {}     # same, for handlers called once per batch with a list
+failed_events = deque(maxlen=10_000)  # dead letters, oldest evicted when full
+_failed_dropped = 0    # dead letters evicted from failed_events so far
+
+# Handlers registered for this event type receive every event, called as
+# handler(event_type, payload, metadata) instead of handler(payload)
+ALL_EVENTS = "*"
+# How many times a failing handler is tried before the event is dead-lettered
+MAX_RETRIES = 3
+
+# IDs are plain ints from one counter: they hash to themselves and are far
+# smaller than uuid strings, and are never reused within a process
+_id_seq = itertools.count(1)
+
+
+def _new_id():
+    return next(_id_seq)
+
+
+# Timestamps are stored as wall-clock nanoseconds (time.time_ns()): an int is
+# cheaper to create and compare than an ISO string, and is only formatted for display
+def _fmt_ts(ns):
+    """Render a nanosecond timestamp as an ISO 8601 string."""
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _to_ns(ts):
+    """Return a timestamp as nanoseconds, accepting ints or ISO 8601 strings."""
+    if type(ts) is int:
+        return ts
+    return _parse_iso_ns(ts)
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_ns(text):
+    # Replays and reports see the same few stored strings over and over
+    return int(datetime.fromisoformat(text).timestamp() * 1e9)
+
+
+def _is_date_only(bound):
+    """True for a bare ISO date such as "2024-01-15", with no time of day."""
+    if type(bound) is not str:
+        return False
+    try:
+        date.fromisoformat(bound)
+    except ValueError:
+        return False
+    return True
+
+
+def _end_ns(bound):
+    """Like _to_ns(), but a date-only ISO bound covers the whole of that day."""
+    end = _to_ns(bound)
+    if _is_date_only(bound):
+        end += _NS_PER_DAY - 1
+    return end
+
+
+class _ItemAccess:
+    """
+    Dict-style reads for slotted record classes.
+
+    record["field"], "field" in record and dict(record) keep working for
+    code written against the dict records these classes replace.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def keys(self):
+        return self.__slots__
 
 
 # --- MESSAGE BROKER ---
 # Central event routing and delivery system
 
-def register_event_handler(event_type: str, handler_func, service_name: str):
+class Event(NamedTuple):
     """
-    TODO: Implement event handler registration.
+    One queued event.
 
-    Should register a handler function for a specific event type.
-    Multiple handlers can be registered for the same event type.
-    Look at test_message_broker_registration() for requirements.
+    A tuple is much smaller than a dict per event; event["type"] and
+    "type" in event still work alongside event.type.
     """
-    pass
+    event_id: int
+    type: str
+    payload: Dict[Any, Any]
+    correlation_id: Any  # caller-supplied, or the event_id of the chain's first event
+    timestamp: int  # time.time_ns(); see _fmt_ts()
 
+    def __getitem__(self, key):
+        if type(key) is str:
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
 
-def emit_event(event_type: str, payload: Dict[Any, Any], correlation_id: str = None):
+    def __contains__(self, key):
+        return key in self._fields
+
+
+def register_event_handler(event_type: str, handler_func, service_name: str, bulk: bool = False):
     """
-    TODO: Implement event emission.
+    Subscribe handler_func, owned by service_name, to event_type.
+
+    Handlers for one type are kept in registration order and each is called
+    with the event's payload; ALL_EVENTS handlers also get the type and the
+    event's metadata.
 
-    Should add event to queue with metadata (timestamp, ID, etc.).
-    Should generate correlation_id if not provided.
-    Look at test_message_broker_emission() for requirements.
+    A bulk handler is called once per processed batch with a list: of
+    payloads, or of the Event records themselves for ALL_EVENTS.
     """
-    pass
+    # Registration is rare and dispatch is hot: rebuild an immutable tuple here
+    # so process_events() iterates a tuple that is never changed under it.
+    # Interned keys let dispatch lookups match on identity.
+    event_type = sys.intern(event_type)
+    handlers = bulk_handlers if bulk else event_handlers
+    handlers[event_type] = handlers.get(event_type, ()) + ((handler_func, service_name),)
 
 
-def process_events(max_events: int = None):
+def emit_event(event_type: str, payload: Dict[Any, Any], correlation_id: str = None):
     """
-    TODO: Implement event processing.
+    Queue an event and return its ID.
 
-    Should process events from queue and call registered handlers.
-    Should handle failures gracefully and support retry logic.
-    Look at test_message_broker_processing() for requirements.
+    The event is stamped with a new ID and the current time. Without a
+    correlation_id it starts a new chain whose ID is the event's own.
     """
-    pass
+    event_id = _new_id()
+    # An event without a correlation ID starts a new chain named after itself
+    event_queue.append(Event(event_id, sys.intern(event_type), payload,
+                             correlation_id or event_id, time.time_ns()))
+    return event_id
+
+
+def process_events(max_events: int = None):
+    """
+    Deliver queued events to their handlers and return how many were processed.
+
+    At most max_events are taken when given. A handler that raises is
+    retried up to MAX_RETRIES times and then dead-lettered, without stopping
+    delivery to the other handlers.
+    """
+    processed = 0
+    while event_queue and (max_events is None or processed < max_events):
+        # Take everything queued so far in one go; events the handlers emit
+        # while this batch runs are picked up by the next pass
+        budget = len(event_queue)
+        if max_events is not None:
+            budget = min(budget, max_events - processed)
+        if budget == len(event_queue):
+            batch = list(event_queue)
+            event_queue.clear()
+        else:
+            batch = [event_queue.popleft() for _ in range(budget)]
+
+        # Events for bulk handlers, grouped by type in arrival order
+        grouped = defaultdict(list) if bulk_handlers else None
+        # get() yields the tuple bound right now; registering a handler binds a
+        # new tuple and never changes this one, so no lock is needed. Wildcard
+        # handlers are looked up once per batch rather than once per event.
+        handlers_for = event_handlers.get
+        wildcard = handlers_for(ALL_EVENTS, ())
+        for event in batch:
+            event_type = event.type
+            payload = event.payload
+
+            # Handlers are called directly under one guard per event; only if
+            # one raises does _isolate_failure() take over, entry by entry
+            handlers = handlers_for(event_type, ())
+            try:
+                for entry in handlers:
+                    entry[0](payload)
+            except Exception as e:
+                _isolate_failure(event, handlers, entry, e, (payload,))
+            if wildcard:
+                args = (event_type, payload, _event_metadata(event))
+                try:
+                    for entry in wildcard:
+                        entry[0](*args)
+                except Exception as e:
+                    _isolate_failure(event, wildcard, entry, e, args)
+            if grouped is not None:
+                grouped[event_type].append(event)
+
+        if grouped:
+            _deliver_bulk(batch, grouped)
+        processed += len(batch)
+    return processed
+
+
+def _event_metadata(event):
+    return {"event_id": event.event_id,
+            "correlation_id": event.correlation_id,
+            "timestamp": event.timestamp}
+
+
+def _deliver_bulk(batch, grouped):
+    """Hand each bulk handler all of this batch's events it subscribed to at once."""
+    for event_type, events in grouped.items():
+        for handler, service_name in bulk_handlers.get(event_type, ()):
+            _deliver_group(events, service_name, handler,
+                           [event.payload for event in events])
+    # The batch already holds Event records, so wildcard bulk handlers get it
+    # as is rather than a per-event (type, payload, metadata) rebuild
+    for handler, service_name in bulk_handlers.get(ALL_EVENTS, ()):
+        _deliver_group(batch, service_name, handler, batch)
+
+
+def _isolate_failure(event, handlers, failed_entry, error, args):
+    """
+    Recover from a handler raising during the guarded dispatch loop.
+
+    The failed handler has used one attempt and is retried; the handlers
+    after it haven't run yet and are delivered one by one. Handlers before
+    it already succeeded and are not called again.
+    """
+    position = next(i for i, entry in enumerate(handlers) if entry is failed_entry)
+    handler, service_name = failed_entry
+    _deliver(event, service_name, handler, *args, attempts=1, error=error)
+    for handler, service_name in handlers[position + 1:]:
+        _deliver(event, service_name, handler, *args)
+
+
+def _deliver(event, service_name, handler, *args, attempts=0, error=None):
+    """Call one handler, retrying it and dead-lettering the event if it keeps failing."""
+    while attempts < MAX_RETRIES:
+        attempts += 1
+        try:
+            handler(*args)
+            return True
+        except Exception as e:
+            error = e
+    _dead_letter({
+        "original_event": event,
+        "service": service_name,
+        "error": str(error),
+        "attempts": attempts,
+        "failed_at": time.time_ns()
+    })
+    return False
+
+
+def _deliver_group(events, service_name, handler, items):
+    """
+    Like _deliver(), but for a bulk handler.
+
+    If the bulk call fails, the items are redelivered one at a time, so only
+    the events that fail on their own are retried and dead-lettered. Bulk
+    handlers must not change any state when they raise.
+    """
+    try:
+        handler(items)
+        return True
+    except Exception as e:
+        if len(items) == 1:
+            return _deliver(events[0], service_name, handler, items, attempts=1, error=e)
+    delivered = True
+    for event, item in zip(events, items):
+        delivered &= _deliver(event, service_name, handler, [item])
+    return delivered
+
+
+def _dead_letter(record):
+    """Store a dead letter, counting the oldest one if the buffer evicts it."""
+    global _failed_dropped
+    if len(failed_events) == failed_events.maxlen:
+        _failed_dropped += 1
+    failed_events.append(record)
 
 
 def get_failed_events():
     """
-    TODO: Implement failed event retrieval.
+    Return the events whose handlers kept failing after every retry.
 
-    Should return events that failed processing.
-    Look at test_message_broker_failure_handling() for requirements.
+    Returns an immutable snapshot; the records themselves are shared.
     """
-    pass
+    return tuple(failed_events)
 
 
-def clear_event_queue():
-    """
-    TODO: Implement queue clearing.
+def get_dropped_failed_event_count():
+    """Return how many dead letters were evicted because failed_events was full."""
+    return _failed_dropped
 
-    Should clear all events and reset broker state.
-    """
-    pass
+
+def clear_event_queue():
+    """Drop queued and failed events and unregister every handler."""
+    global _failed_dropped, _initialized
+    # Cleared in place so modules holding these objects keep seeing them
+    event_queue.clear()
+    event_handlers.clear()
+    bulk_handlers.clear()
+    failed_events.clear()
+    _failed_dropped = 0
+    _initialized = False  # the services' handlers are gone with the rest
 
 
 # --- LIBRARY SERVICE ---
 # Core domain service for books and users
 
+_BOOK_ADDED_MSG = "Book {} added.".format
+_USER_REGISTERED_MSG = "User {} registered.".format
+_DUPLICATE_ISBN_MSG = "Error: a book with ISBN {} already exists.".format
+_DUPLICATE_EMAIL_MSG = "Error: email {} is already registered.".format
+_INVALID_EMAIL_MSG = "Error: invalid email {!r}.".format
+_USER_NOT_FOUND_MSG = "Error: user {} not found.".format
+_USER_NOT_ACTIVE_MSG = "Error: user {} is not active.".format
+_BOOK_NOT_FOUND_MSG = "Error: book {} not found.".format
+_NOT_AVAILABLE_MSG = "Error: book {} is not available.".format
+_ALREADY_BORROWED_MSG = "Error: user {} already has book {} borrowed.".format
+_BORROW_LIMIT_MSG = "Error: user {} has reached the limit of {} borrowed books.".format
+_BORROWED_OK_MSG = "Book {} borrowed successfully.".format
+_NOT_BORROWED_MSG = "Error: book {} is not borrowed by user {}.".format
+_RETURNED_OK_MSG = "Book {} returned successfully.".format
+_SUSPENDED_OK_MSG = "User {} suspended.".format
+
+# Compiled once at import; the bound fullmatch() skips re's pattern cache per call
+_is_valid_email = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+").fullmatch
+
+# How many books each kind of user may have out at once
+_BORROW_LIMITS = {"standard": 5, "premium": 10}
+LOAN_PERIOD_NS = 14 * _NS_PER_DAY
+LATE_FEE_PER_DAY = 0.25
+
 def add_book_to_library(isbn: str, title: str, author: str, copies: int = 1):
     """
-    TODO: Implement book addition with event emission.
+    Store a new book, emit BookAdded and return a confirmation message.
 
-    Should validate input, store book, and emit BookAdded event.
-    Should generate unique book ID and handle duplicate ISBNs.
-    Look at test_library_service_add_book() for requirements.
+    Returns an error message instead if a book with the same ISBN exists.
     """
-    pass
+    books_by_isbn = library_db["books_by_isbn"]
+    if isbn in books_by_isbn:
+        return _DUPLICATE_ISBN_MSG(isbn)
+
+    book_id = _new_id()
+    library_db["books"][book_id] = {
+        "isbn": isbn,
+        "title": title,
+        "author": author,
+        "total_copies": copies,
+        "available_copies": copies
+    }
+    books_by_isbn[isbn] = book_id
+    emit_event("BookAdded", {"book_id": book_id, "isbn": isbn, "title": title,
+                             "author": author, "copies": copies})
+    return _BOOK_ADDED_MSG(book_id)
 
 
 def register_user(email: str, name: str, user_type: str = "standard"):
     """
-    TODO: Implement user registration with event emission.
+    Store a new active user, emit UserRegistered and return a confirmation message.
 
-    Should validate input, store user, and emit UserRegistered event.
-    Should handle duplicate emails and validate email format.
-    Look at test_library_service_register_user() for requirements.
+    Returns an error message instead for a malformed email or one already
+    registered, compared without regard to case.
     """
-    pass
+    if not _is_valid_email(email):
+        return _INVALID_EMAIL_MSG(email)
+    # Addresses differing only in case belong to the same person
+    email_key = email.lower()
+    users_by_email = library_db["users_by_email"]
+    if email_key in users_by_email:
+        return _DUPLICATE_EMAIL_MSG(email)
 
+    user_id = _new_id()
+    library_db["users"][user_id] = {
+        "email": email,
+        "name": name,
+        "user_type": user_type,
+        "status": "active"
+    }
+    users_by_email[email_key] = user_id
+    emit_event("UserRegistered", {"user_id": user_id, "email": email,
+                                  "name": name, "user_type": user_type})
+    return _USER_REGISTERED_MSG(user_id)
 
-def borrow_book(user_id: str, book_id: str):
-    """
-    TODO: Implement book borrowing with complex event emission.
 
-    Should validate availability, update state, emit BookBorrowed event.
-    Should handle business rules: user limits, book availability, etc.
-    Look at test_library_service_borrow_book() for requirements.
+def borrow_book(user_id: str, book_id: str):
     """
-    pass
+    Lend a book to a user, emit BookBorrowed and return a confirmation message.
+
+    Returns an error message instead if the user is unknown or not active,
+    the book is unknown or has no copies left, the user already has it, or
+    the user is at the borrowing limit for their user_type.
+    """
+    user = library_db["users"].get(user_id)
+    if user is None:
+        return _USER_NOT_FOUND_MSG(user_id)
+    if user["status"] != "active":
+        return _USER_NOT_ACTIVE_MSG(user_id)
+    book = library_db["books"].get(book_id)
+    if book is None:
+        return _BOOK_NOT_FOUND_MSG(book_id)
+    if book["available_copies"] <= 0:
+        return _NOT_AVAILABLE_MSG(book_id)
+    # Read with get(): indexing the defaultdict would leave an empty entry behind
+    open_borrowings = library_db["borrowings_by_user"].get(user_id, {})
+    if book_id in open_borrowings:
+        return _ALREADY_BORROWED_MSG(user_id, book_id)
+    limit = _BORROW_LIMITS.get(user["user_type"], _BORROW_LIMITS["standard"])
+    if len(open_borrowings) >= limit:
+        return _BORROW_LIMIT_MSG(user_id, limit)
+
+    now = time.time_ns()
+    borrowing_id = _new_id()
+    borrowing = {
+        "borrowing_id": borrowing_id,
+        "user_id": user_id,
+        "book_id": book_id,
+        "borrowed_date": now,
+        "due_date": now + LOAN_PERIOD_NS,
+        "returned_date": None
+    }
+    library_db["borrowings"][borrowing_id] = borrowing
+    library_db["borrowings_by_user"][user_id][book_id] = borrowing
+    book["available_copies"] -= 1
+    emit_event("BookBorrowed", {"user_id": user_id, "book_id": book_id,
+                                "book_title": book["title"], "borrowed_date": now,
+                                "due_date": borrowing["due_date"]})
+    return _BORROWED_OK_MSG(book_id)
 
 
 def return_book(user_id: str, book_id: str):
     """
-    TODO: Implement book return with event emission.
-
-    Should validate borrowing exists, update state, emit BookReturned event.
-    Should calculate late fees if applicable.
-    Look at test_library_service_return_book() for requirements.
-    """
-    pass
+    Close a user's loan of a book, emit BookReturned and return a confirmation message.
+
+    The event carries a late fee of LATE_FEE_PER_DAY for each full day past
+    the due date. Returns an error message instead if the user has no open
+    loan of the book or the book no longer exists.
+    """
+    open_borrowings = library_db["borrowings_by_user"].get(user_id, {})
+    borrowing = open_borrowings.get(book_id)
+    if borrowing is None:
+        return _NOT_BORROWED_MSG(book_id, user_id)
+    book = library_db["books"].get(book_id)
+    if book is None:
+        return _BOOK_NOT_FOUND_MSG(book_id)
+
+    now = time.time_ns()
+    del open_borrowings[book_id]
+    borrowing["returned_date"] = now
+    book["available_copies"] += 1
+    days_late = max(0, now - borrowing["due_date"]) // _NS_PER_DAY
+    emit_event("BookReturned", {"user_id": user_id, "book_id": book_id,
+                                "book_title": book["title"],
+                                "borrowed_date": borrowing["borrowed_date"],
+                                "returned_date": now,
+                                "late_fee": days_late * LATE_FEE_PER_DAY})
+    return _RETURNED_OK_MSG(book_id)
 
 
 def get_user_borrowings(user_id: str):
-    """
-    TODO: Implement user borrowing retrieval.
-
-    Should return current borrowings for a user.
-    Look at test_library_service_user_borrowings() for requirements.
-    """
-    pass
+    """Return the user's open loans."""
+    return list(library_db["borrowings_by_user"].get(user_id, {}).values())
 
 
 def suspend_user(user_id: str, reason: str):
     """
-    TODO: Implement user suspension with event emission.
+    Suspend an active user, emit UserSuspended and return a confirmation message.
 
-    Should suspend user and emit UserSuspended event.
-    Look at test_library_service_suspend_user() for requirements.
+    Returns an error message instead if the user is unknown or not active.
     """
-    pass
+    user = library_db["users"].get(user_id)
+    if user is None:
+        return _USER_NOT_FOUND_MSG(user_id)
+    if user["status"] != "active":
+        return _USER_NOT_ACTIVE_MSG(user_id)
+    user["status"] = "suspended"
+    emit_event("UserSuspended", {"user_id": user_id, "reason": reason,
+                                 "suspended_date": time.time_ns()})
+    return _SUSPENDED_OK_MSG(user_id)
 
 
 # --- NOTIFICATION SERVICE ---
 # Handles all user communications and alerts
 
-def handle_user_registered(payload: Dict[Any, Any]):
-    """
-    TODO: Implement welcome notification handler.
+# Message templates, bound once instead of being rebuilt for every event
+_WELCOME_MSG = "Welcome to the library, {name}!".format_map
+_BORROWED_MSG = "You borrowed '{}'. Please return it by {}.".format
+_RETURNED_MSG = "You returned '{book_title}'. Thank you!".format_map
+_SUSPENDED_MSG = "Your account has been suspended: {reason}".format_map
+_LATE_FEE_MSG = "'{book_title}' was returned late; a fee of {late_fee:.2f} applies.".format_map
 
-    Should create user in notification system and send welcome message.
-    Look at test_notification_service_user_registered() for requirements.
-    """
-    pass
+def handle_user_registered(payload: Dict[Any, Any]):
+    """Record a new user's contact details and send them a welcome message."""
+    user_id = payload["user_id"]
+    notification_db["users"][user_id] = {"email": payload.get("email"), "name": payload.get("name")}
+    send_notification(user_id, _WELCOME_MSG(payload), "welcome")
 
 
 def handle_book_borrowed(payload: Dict[Any, Any]):
-    """
-    TODO: Implement borrow notification handler.
-
-    Should send confirmation and due date reminder notifications.
-    Look at test_notification_service_book_borrowed() for requirements.
-    """
-    pass
+    """Confirm a loan to the borrower, including the due date."""
+    due_date = payload["due_date"]
+    if type(due_date) is int:
+        due_date = _fmt_ts(due_date)  # events carry nanoseconds; users get a date
+    send_notification(payload["user_id"], _BORROWED_MSG(payload["book_title"], due_date),
+                      "borrow_confirmation")
 
 
 def handle_book_returned(payload: Dict[Any, Any]):
-    """
-    TODO: Implement return notification handler.
+    """Confirm a return to the borrower and tell them about any late fee."""
+    user_id = payload["user_id"]
+    send_notification(user_id, _RETURNED_MSG(payload), "return_confirmation")
+    if payload.get("late_fee", 0) > 0:
+        send_notification(user_id, _LATE_FEE_MSG(payload), "late_fee")
 
-    Should send return confirmation and late fee notifications if applicable.
-    Look at test_notification_service_book_returned() for requirements.
-    """
-    pass
 
+@dataclass(slots=True)
+class Notification(_ItemAccess):
+    """One message sent to a user; slotted, since every user accumulates many."""
+    notification_id: int
+    user_id: Any
+    message: str
+    type: str
+    timestamp: int  # time.time_ns(); see _fmt_ts()
 
-def send_notification(user_id: str, message: str, notification_type: str):
-    """
-    TODO: Implement notification sending.
 
-    Should store notification and emit NotificationSent event.
-    Look at test_notification_service_send() for requirements.
-    """
-    pass
+def send_notification(user_id: str, message: str, notification_type: str):
+    """Store a notification for a user, emit NotificationSent and return its ID."""
+    notification_id = _new_id()
+    notification = Notification(notification_id, user_id, message, notification_type, time.time_ns())
+    notification_db["notifications"][user_id].append(notification)
+    notification_db["by_user_and_type"][(user_id, notification_type)].append(notification)
+    emit_event("NotificationSent", {"notification_id": notification_id,
+                                    "user_id": user_id,
+                                    "type": notification_type})
+    return notification_id
 
 
 def get_user_notifications(user_id: str):
-    """
-    TODO: Implement user notification retrieval.
+    """Return every notification sent to a user, oldest first."""
+    return list(notification_db["notifications"].get(user_id, ()))
 
-    Should return all notifications for a user.
-    Look at test_notification_service_get_notifications() for requirements.
-    """
-    pass
+
+def get_user_notifications_by_type(user_id: str, notification_type: str):
+    """Return a user's notifications of one type, oldest first, without filtering."""
+    return list(notification_db["by_user_and_type"].get((user_id, notification_type), ()))
 
 
 def set_notification_preferences(user_id: str, preferences: Dict[str, bool]):
@@ -263,57 +653,196 @@ def set_notification_preferences(user_id: str, preferences: Dict[str, bool]):
     pass
 
 
+def handle_user_suspended(payload: Dict[Any, Any]):
+    """Tell a user that their account has been suspended."""
+    send_notification(payload["user_id"], _SUSPENDED_MSG(payload), "account_suspended")
+
+
 # --- ANALYTICS SERVICE ---
 # Tracks usage patterns and generates insights
 
 def handle_book_borrowed_analytics(payload: Dict[Any, Any]):
-    """
-    TODO: Implement borrowing analytics handler.
+    """Count a borrow towards the usage totals and the book's popularity."""
+    handle_books_borrowed_analytics([payload])
 
-    Should track borrowing patterns and update metrics.
-    Look at test_analytics_service_book_borrowed() for requirements.
-    """
-    pass
+
+def handle_books_borrowed_analytics(payloads):
+    """Bulk form of handle_book_borrowed_analytics(): one metrics update per batch."""
+    # Read every payload before changing anything, so a bad one raises cleanly
+    book_ids = [payload["book_id"] for payload in payloads]
+    _record_analytics_events("book_borrowed", "borrowed_date", payloads)
+    _bump_metric("total_borrows", len(payloads))
+    analytics_db["metrics"].setdefault("popularity", Counter()).update(book_ids)
 
 
 def handle_book_returned_analytics(payload: Dict[Any, Any]):
-    """
-    TODO: Implement return analytics handler.
+    """Count a return and add the loan's length to the total borrowing time."""
+    handle_books_returned_analytics([payload])
 
-    Should track return patterns and calculate duration metrics.
-    Look at test_analytics_service_book_returned() for requirements.
-    """
-    pass
 
+def handle_books_returned_analytics(payloads):
+    """Bulk form of handle_book_returned_analytics(): one metrics update per batch."""
+    borrow_ns = sum(
+        _to_ns(payload["returned_date"]) - _to_ns(payload["borrowed_date"])
+        for payload in payloads
+        if payload.get("returned_date") is not None and payload.get("borrowed_date") is not None)
+    _record_analytics_events("book_returned", "returned_date", payloads)
+    _bump_metric("total_returns", len(payloads))
+    _bump_metric("total_borrow_ns", borrow_ns)
 
-def handle_user_registered_analytics(payload: Dict[Any, Any]):
-    """
-    TODO: Implement user registration analytics handler.
 
-    Should track user growth and demographics.
-    Look at test_analytics_service_user_registered() for requirements.
-    """
-    pass
+def handle_user_registered_analytics(payload: Dict[Any, Any]):
+    """Count a new user towards the user totals, by user_type."""
+    handle_users_registered_analytics([payload])
+
+
+def handle_users_registered_analytics(payloads):
+    """Bulk form of handle_user_registered_analytics(): one metrics update per batch."""
+    user_types = [payload.get("user_type", "standard") for payload in payloads]
+    _record_analytics_events("user_registered", None, payloads)
+    _bump_metric("total_users", len(payloads))
+    analytics_db["metrics"].setdefault("user_types", Counter()).update(user_types)
+
+
+def handle_book_added_analytics(payload: Dict[Any, Any]):
+    """Track catalogue growth."""
+    _record_analytics_events("book_added", None, (payload,))
+    _bump_metric("total_books")
+
+
+def handle_notification_sent_analytics(payload: Dict[Any, Any]):
+    """Count notifications; they are too frequent to keep as individual events."""
+    _bump_metric("notifications_sent")
+
+
+def _record_analytics_events(event_type, timestamp_field, payloads):
+    """Append one analytics event per payload, timestamped from timestamp_field if set."""
+    now = time.time_ns()
+    # Payloads are never modified once emitted, so events share them as "data".
+    # Built as a list first so a bad payload can't leave a partial extend().
+    analytics_db["events"].extend([{
+        "type": event_type,
+        "timestamp": (payload.get(timestamp_field) if timestamp_field else None) or now,
+        "data": payload
+    } for payload in payloads])
+
+
+def _bump_metric(name, amount=1):
+    metrics = analytics_db["metrics"]
+    metrics[name] = metrics.get(name, 0) + amount
+
+
+# Small tags for the analytics event types reports care about; others are 0
+_EVENT_TAGS = {"book_borrowed": 1, "book_returned": 2}
+
+
+def _index_analytics_events():
+    """
+    Bring the analytics columns and ["daily"] up to date with ["events"].
+
+    Events are indexed lazily, so ones appended directly to the list are
+    picked up too. Each event is added to its day's running totals once.
+    Scans read the flat tag and timestamp arrays and only touch an event's
+    dict once it is known to be in range and of interest.
+    """
+    events = analytics_db["events"]
+    tags = analytics_db["event_tags"]
+    if len(tags) < len(events):
+        daily = analytics_db["daily"]
+        new_entries = []
+        for i in range(len(tags), len(events)):
+            event = events[i]
+            ns = _to_ns(event["timestamp"])
+            tags.append(_EVENT_TAGS.get(event["type"], 0))
+            new_entries.append((ns, i))
+            day = date.fromtimestamp(ns / 1e9)
+            bucket = daily.get(day)
+            if bucket is None:
+                bucket = daily[day] = {"borrows": 0, "returns": 0, "users": set(), "books": Counter()}
+            _tally(bucket, event)
+
+        new_entries.sort()
+        ts_col = analytics_db["event_ts"]
+        pos_col = analytics_db["event_pos"]
+        if ts_col and new_entries[0][0] < ts_col[-1]:
+            # Something arrived out of order: re-sort the whole index
+            new_entries = sorted(itertools.chain(zip(ts_col, pos_col), new_entries))
+            del ts_col[:], pos_col[:]
+        ts_col.extend(ns for ns, _ in new_entries)
+        pos_col.extend(i for _, i in new_entries)
+
+
+def _tally(totals, event):
+    """Count one analytics event into a borrows/returns/users/books tally."""
+    event_type = event["type"]
+    if event_type == "book_borrowed":
+        data = event["data"]
+        totals["books"][data["book_id"]] += 1
+        totals["users"].add(data["user_id"])
+        totals["borrows"] += 1
+    elif event_type == "book_returned":
+        totals["returns"] += 1
 
 
 def generate_usage_report(start_date: str, end_date: str):
     """
-    TODO: Implement usage report generation.
-
-    Should create comprehensive usage analytics report.
-    Look at test_analytics_service_report_generation() for requirements.
-    """
-    pass
+    Summarize borrows, returns, active users and popular books between two dates.
+
+    Whole-day ranges are summed from the per-day totals, so the cost grows
+    with the number of days rather than events. Ranges with a time of day
+    bisect the time index and tally only the events inside in one pass.
+    """
+    _index_analytics_events()
+    totals = {"borrows": 0, "returns": 0, "users": set(), "books": Counter()}
+
+    if _is_date_only(start_date) and _is_date_only(end_date):
+        first = date.fromisoformat(start_date)
+        last = date.fromisoformat(end_date)
+        daily = analytics_db["daily"]
+        span = (last - first).days + 1
+        if span <= len(daily):
+            days = (first + timedelta(days=n) for n in range(span))
+            buckets = [daily[day] for day in days if day in daily]
+        else:
+            buckets = [bucket for day, bucket in daily.items() if first <= day <= last]
+        for bucket in buckets:
+            totals["borrows"] += bucket["borrows"]
+            totals["returns"] += bucket["returns"]
+            totals["users"].update(bucket["users"])
+            totals["books"].update(bucket["books"])
+    else:
+        start = _to_ns(start_date)
+        end = _end_ns(end_date)
+        ts_col = analytics_db["event_ts"]
+        lo = bisect_left(ts_col, start)
+        hi = bisect_right(ts_col, end)
+        events = analytics_db["events"]
+        tags = analytics_db["event_tags"]
+        for position in analytics_db["event_pos"][lo:hi]:
+            if tags[position]:
+                _tally(totals, events[position])
+
+    report = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "total_borrows": totals["borrows"],
+        "total_returns": totals["returns"],
+        "active_users": len(totals["users"]),
+        "popular_books": totals["books"].most_common(10)
+    }
+    analytics_db["reports"][(start_date, end_date)] = report
+    return report
 
 
 def get_book_popularity_metrics():
     """
-    TODO: Implement book popularity metrics.
+    Return (book_id, borrow count) pairs, most borrowed first.
 
-    Should return book borrowing frequency and trends.
-    Look at test_analytics_service_popularity_metrics() for requirements.
+    Borrow counts are kept up to date by handle_book_borrowed_analytics(), so
+    this reads the live Counter instead of rescanning the events.
     """
-    pass
+    popularity = analytics_db["metrics"].get("popularity")
+    return popularity.most_common() if popularity else []
 
 
 def track_system_performance(event_type: str, processing_time: float):
@@ -329,78 +858,232 @@ def track_system_performance(event_type: str, processing_time: float):
 # --- AUDIT SERVICE ---
 # Event sourcing and compliance logging
 
+# Payload fields that identify the entities an event belongs to
+_AUDIT_ENTITY_FIELDS = (("user", "user_id"), ("book", "book_id"))
+# Domain events worth keeping; high-volume ones like NotificationSent are skipped
+_AUDIT_TYPES = frozenset({"BookAdded", "BookBorrowed", "BookReturned",
+                          "UserRegistered", "UserSuspended"})
+
+@dataclass(slots=True)
+class AuditRecord(_ItemAccess):
+    """One entry in the audit log; slotted, since the log only ever grows."""
+    event_type: str
+    payload: Dict[Any, Any]
+    timestamp: Any  # time.time_ns(), or an ISO string supplied by the caller
+    correlation_id: Any
+
+
 def handle_any_event_for_audit(event_type: str, payload: Dict[Any, Any], metadata: Dict[Any, Any]):
+    """Log a single event to the audit trail; see handle_events_for_audit()."""
+    handle_events_for_audit([Event(metadata.get("event_id"), event_type, payload,
+                                   metadata.get("correlation_id"),
+                                   metadata.get("timestamp") or time.time_ns())])
+
+
+def handle_events_for_audit(events):
     """
-    TODO: Implement universal audit event handler.
+    Log a batch of Event records in one go.
 
-    Should log all events for compliance and audit purposes.
-    Look at test_audit_service_event_logging() for requirements.
+    Registered as a bulk handler, so a processed batch costs one extend().
+    Events whose type is not in _AUDIT_TYPES are dropped before any work.
+    Everything is built before the log is touched, so a malformed payload
+    raises without leaving part of the batch logged.
     """
-    pass
+    audit_events = [AuditRecord(event.type, event.payload, event.timestamp, event.correlation_id)
+                    for event in events if event.type in _AUDIT_TYPES]
+    # Index by entity as events arrive, so trails come out in order without a scan
+    entries = [((entity_type, entity_id), audit_event)
+               for audit_event in audit_events
+               for entity_type, field in _AUDIT_ENTITY_FIELDS
+               if (entity_id := audit_event.payload.get(field)) is not None]
+    audit_db["events"].extend(audit_events)
+    by_entity = audit_db["by_entity"]
+    for key, audit_event in entries:
+        by_entity[key].append(audit_event)
 
 
 def create_system_snapshot():
     """
-    TODO: Implement system state snapshot creation.
+    Record the current state of every service and return the snapshot's ID.
 
-    Should capture current state of all services for backup/recovery.
-    Look at test_audit_service_snapshot_creation() for requirements.
+    Library records change in place, so they are copied. The event logs and
+    notification lists are append-only: a snapshot just records how long
+    each one was, and its contents are the first that many entries.
     """
-    pass
+    snapshot_id = _new_id()
+    audit_db["snapshots"][snapshot_id] = {
+        "snapshot_id": snapshot_id,
+        "timestamp": time.time_ns(),
+        "library": {table: {key: dict(record) for key, record in library_db[table].items()}
+                    for table in ("books", "users", "borrowings")},
+        "notification_counts": {user_id: len(notifications) for user_id, notifications
+                                in notification_db["notifications"].items()},
+        "analytics_events": len(analytics_db["events"]),
+        "audit_events": len(audit_db["events"])
+    }
+    return snapshot_id
 
 
 def reconstruct_state_from_events(target_date: str):
     """
-    TODO: Implement state reconstruction from events.
-
-    Should rebuild system state by replaying events up to target date.
-    Look at test_audit_service_state_reconstruction() for requirements.
-    """
-    pass
+    Rebuild the library's books, users and open loans as of target_date from the audit log.
+
+    Event timestamps are compared as ints; stored ISO strings go through the
+    memoized parser, so each distinct string is parsed only once.
+    """
+    cutoff = _end_ns(target_date)
+    books, users, borrowings = {}, {}, {}
+    for audit_event in audit_db["events"]:
+        if _to_ns(audit_event.timestamp) > cutoff:
+            continue
+        event_type = audit_event.event_type
+        payload = audit_event.payload
+        if event_type == "BookAdded":
+            books[payload["book_id"]] = {
+                "isbn": payload["isbn"], "title": payload["title"], "author": payload["author"],
+                "total_copies": payload["copies"], "available_copies": payload["copies"]
+            }
+        elif event_type == "UserRegistered":
+            users[payload["user_id"]] = {
+                "email": payload["email"], "name": payload["name"],
+                "user_type": payload.get("user_type", "standard"), "status": "active"
+            }
+        elif event_type == "UserSuspended":
+            if payload["user_id"] in users:
+                users[payload["user_id"]]["status"] = "suspended"
+        elif event_type == "BookBorrowed":
+            key = (payload["user_id"], payload["book_id"])
+            borrowings[key] = {"user_id": key[0], "book_id": key[1],
+                               "borrowed_date": payload.get("borrowed_date")}
+            if key[1] in books:
+                books[key[1]]["available_copies"] -= 1
+        elif event_type == "BookReturned":
+            key = (payload["user_id"], payload["book_id"])
+            if borrowings.pop(key, None) is not None and key[1] in books:
+                books[key[1]]["available_copies"] += 1
+    return {"books": books, "users": users, "borrowings": borrowings}
 
 
 def get_audit_trail(entity_type: str, entity_id: str):
-    """
-    TODO: Implement audit trail retrieval.
+    """Return the audit events that name an entity, in the order they arrived."""
+    return list(audit_db["by_entity"].get((entity_type, entity_id), ()))
 
-    Should return chronological history of events for an entity.
-    Look at test_audit_service_audit_trail() for requirements.
-    """
-    pass
 
+def _audit_json_default(value):
+    """Encode AuditRecords as objects; refuse anything else JSON can't represent."""
+    if type(value) is AuditRecord:
+        return dict(value)
+    raise TypeError(f"audit payload value of type {type(value).__name__} "
+                    f"is not JSON serializable: {value!r}")
 
-def detect_anomalies():
-    """
-    TODO: Implement anomaly detection.
 
-    Should analyze event patterns and detect suspicious activities.
-    Look at test_audit_service_anomaly_detection() for requirements.
+# One encoder reused for every export instead of json.dumps() building one per call
+_AUDIT_JSON = json.JSONEncoder(separators=(",", ":"), check_circular=False,
+                               ensure_ascii=False, default=_audit_json_default).encode
+
+
+def export_audit_log():
+    """Serialize the audit log for compliance export, one JSON document per event."""
+    return [_AUDIT_JSON(audit_event) for audit_event in audit_db["events"]]
+
+
+ANOMALY_WINDOW_NS = 3600 * 10**9
+ANOMALY_BORROW_LIMIT = 5
+
+
+def detect_anomalies():
     """
-    pass
+    Return a record for each user borrowing suspiciously often.
+
+    Flags users with more than ANOMALY_BORROW_LIMIT borrows in the last
+    ANOMALY_WINDOW_NS. Each user's trail is in arrival order, so it is read
+    backwards and only the events inside the window are visited.
+    """
+    cutoff = time.time_ns() - ANOMALY_WINDOW_NS
+    anomalies = []
+    for (entity_type, entity_id), trail in audit_db["by_entity"].items():
+        if entity_type != "user":
+            continue
+        borrows = 0
+        for audit_event in reversed(trail):
+            if _to_ns(audit_event.timestamp) < cutoff:
+                break
+            if audit_event.event_type == "BookBorrowed":
+                borrows += 1
+        if borrows > ANOMALY_BORROW_LIMIT:
+            anomalies.append({"type": "excessive_borrowing", "user_id": entity_id,
+                              "count": borrows, "window_start": cutoff})
+    return anomalies
 
 
 # --- SYSTEM INITIALIZATION ---
+_initialized = False  # whether the services' handlers are registered
+
+
 def initialize_event_driven_system():
     """
-    TODO: Implement system initialization.
-
-    Should register all event handlers for all services.
-    Look at test_system_initialization() for requirements.
-    """
-    pass
+    Subscribe every service's handlers to the events they consume.
+
+    Calling it again before the next reset is a no-op, so handlers are never
+    registered twice (which would deliver every event to them twice).
+    """
+    global _initialized
+    if _initialized:
+        return
+    _initialized = True
+    for event_type, handler, service_name in _SUBSCRIPTIONS:
+        register_event_handler(event_type, handler, service_name)
+    for event_type, handler, service_name in _BULK_SUBSCRIPTIONS:
+        register_event_handler(event_type, handler, service_name, bulk=True)
+
+
+# Every service's subscriptions, in registration order
+_SUBSCRIPTIONS = (
+    ("UserRegistered", handle_user_registered, "NotificationService"),
+    ("BookBorrowed", handle_book_borrowed, "NotificationService"),
+    ("BookReturned", handle_book_returned, "NotificationService"),
+    ("UserSuspended", handle_user_suspended, "NotificationService"),
+    ("BookAdded", handle_book_added_analytics, "AnalyticsService"),
+    ("NotificationSent", handle_notification_sent_analytics, "AnalyticsService"),
+)
+# Handlers that take a whole batch's events at once; see register_event_handler()
+_BULK_SUBSCRIPTIONS = (
+    ("BookBorrowed", handle_books_borrowed_analytics, "AnalyticsService"),
+    ("BookReturned", handle_books_returned_analytics, "AnalyticsService"),
+    ("UserRegistered", handle_users_registered_analytics, "AnalyticsService"),
+    (ALL_EVENTS, handle_events_for_audit, "AuditService"),
+)
 
 
 def clear_all_system_state():
+    """Empty every service's data and the broker's queue and handlers."""
+    for db in (library_db, notification_db, analytics_db, audit_db):
+        for table in db.values():
+            if type(table) is array:
+                del table[:]  # arrays have no clear()
+            else:
+                table.clear()
+    clear_event_queue()
+
+
+def reset_event_driven_system():
     """
-    TODO: Implement complete system reset.
+    Return the system to a freshly initialized state in one call.
 
-    Should clear all service databases and event broker state.
+    Same as clear_all_system_state() followed by initialize_event_driven_system();
+    handlers registered outside the standard subscriptions are dropped.
     """
-    pass
+    clear_all_system_state()
+    initialize_event_driven_system()
 
 
 # --- TEST SUITE ---
 
+def _first(iterable):
+    """Return the first key (or item) without building a list of them all."""
+    return next(iter(iterable))
+
+
 class TestMessageBroker(unittest.TestCase):
     """
     Tests for the Message Broker - event routing and delivery.
@@ -463,6 +1146,107 @@ class TestMessageBroker(unittest.TestCase):
         self.assertEqual(len(processed_events), 1)
         self.assertEqual(processed_events[0]["data"], "process_me")
 
+    def test_message_broker_processing_in_batches(self):
+        """Test events emitted by handlers are processed after the current batch."""
+        order = []
+
+        def first_handler(payload):
+            order.append(payload["n"])
+            if payload["n"] == 1:
+                emit_event("BatchTest", {"n": 3})
+
+        register_event_handler("BatchTest", first_handler, "TestService")
+        emit_event("BatchTest", {"n": 1})
+        emit_event("BatchTest", {"n": 2})
+
+        # A limit stops processing part-way, leaving the rest queued
+        self.assertEqual(process_events(max_events=1), 1)
+        self.assertEqual(order, [1])
+        self.assertEqual(len(event_queue), 2)
+
+        self.assertEqual(process_events(), 2)
+        self.assertEqual(order, [1, 2, 3])
+        self.assertEqual(len(event_queue), 0)
+
+    def test_message_broker_failure_isolation(self):
+        """Test a failing handler neither reruns nor blocks the other handlers."""
+        calls = []
+
+        def before(payload):
+            calls.append("before")
+
+        def flaky(payload):
+            calls.append("flaky")
+            if calls.count("flaky") < 2:
+                raise ValueError("transient")
+
+        def after(payload):
+            calls.append("after")
+
+        for handler in (before, flaky, after):
+            register_event_handler("IsolateTest", handler, "TestService")
+        emit_event("IsolateTest", {})
+        process_events()
+
+        self.assertEqual(calls, ["before", "flaky", "flaky", "after"])
+        self.assertEqual(get_failed_events(), ())
+
+    def test_message_broker_bulk_failure_isolation(self):
+        """Test a failing bulk call is redelivered per event and only the bad one dead-lettered."""
+        delivered = []
+
+        def strict(payloads):
+            if any(payload.get("bad") for payload in payloads):
+                raise ValueError("bad payload")
+            delivered.extend(payloads)
+
+        register_event_handler("BulkTest", strict, "TestService", bulk=True)
+        emit_event("BulkTest", {"n": 1})
+        emit_event("BulkTest", {"n": 2, "bad": True})
+        process_events()
+
+        self.assertEqual(delivered, [{"n": 1}])
+        failed = get_failed_events()
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0]["original_event"]["payload"], {"n": 2, "bad": True})
+        self.assertEqual(failed[0]["attempts"], MAX_RETRIES)
+
+    def test_message_broker_registration_during_dispatch(self):
+        """Test a handler registered mid-dispatch only sees later events."""
+        calls = []
+
+        def late_handler(payload):
+            calls.append(("late", payload["n"]))
+
+        def first_handler(payload):
+            calls.append(("first", payload["n"]))
+            if payload["n"] == 1:
+                register_event_handler("SwapTest", late_handler, "TestService")
+
+        register_event_handler("SwapTest", first_handler, "TestService")
+        emit_event("SwapTest", {"n": 1})
+        process_events()
+        emit_event("SwapTest", {"n": 2})
+        process_events()
+
+        self.assertEqual(calls, [("first", 1), ("first", 2), ("late", 2)])
+
+    def test_message_broker_bulk_handlers(self):
+        """Test bulk handlers get each batch's events as one list."""
+        calls = []
+        register_event_handler("BulkTest", calls.append, "TestService", bulk=True)
+        register_event_handler(ALL_EVENTS, calls.append, "TestService", bulk=True)
+
+        emit_event("BulkTest", {"n": 1})
+        emit_event("OtherTest", {"n": 2})
+        emit_event("BulkTest", {"n": 3})
+        self.assertEqual(process_events(), 3)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0], [{"n": 1}, {"n": 3}])
+        self.assertEqual([(event.type, event.payload) for event in calls[1]],
+                         [("BulkTest", {"n": 1}), ("OtherTest", {"n": 2}), ("BulkTest", {"n": 3})])
+
     def test_message_broker_failure_handling(self):
         """Test handling of failed event processing."""
 
@@ -488,8 +1272,7 @@ class TestLibraryService(unittest.TestCase):
 
     def setUp(self):
         """Set up clean state before each test."""
-        clear_all_system_state()
-        initialize_event_driven_system()
+        reset_event_driven_system()
 
     def test_library_service_add_book(self):
         """Test book addition with event emission."""
@@ -501,7 +1284,7 @@ class TestLibraryService(unittest.TestCase):
 
         # Book should be stored
         self.assertEqual(len(library_db["books"]), 1)
-        book_id = list(library_db["books"].keys())[0]
+        book_id = _first(library_db["books"])
         book = library_db["books"][book_id]
 
         self.assertEqual(book["isbn"], "978-0-123456-78-9")
@@ -514,6 +1297,19 @@ class TestLibraryService(unittest.TestCase):
         process_events()
         # Verify through audit trail that event was processed
 
+    def test_library_service_rejects_duplicate_isbn(self):
+        """Test duplicate ISBNs are rejected until the system is reset."""
+        add_book_to_library("978-0-123456-78-9", "Original", "Author", 1)
+        result = add_book_to_library("978-0-123456-78-9", "Copy", "Author", 1)
+        self.assertIn("error", result.lower())
+        self.assertIn("isbn", result.lower())
+        self.assertEqual(len(library_db["books"]), 1)
+
+        # The ISBN index is cleared along with the books
+        clear_all_system_state()
+        result = add_book_to_library("978-0-123456-78-9", "Original", "Author", 1)
+        self.assertIn("added", result.lower())
+
     def test_library_service_register_user(self):
         """Test user registration with validation and event emission."""
         result = register_user("test@example.com", "Test User", "premium")
@@ -524,7 +1320,7 @@ class TestLibraryService(unittest.TestCase):
 
         # User should be stored
         self.assertEqual(len(library_db["users"]), 1)
-        user_id = list(library_db["users"].keys())[0]
+        user_id = _first(library_db["users"])
         user = library_db["users"][user_id]
 
         self.assertEqual(user["email"], "test@example.com")
@@ -537,14 +1333,23 @@ class TestLibraryService(unittest.TestCase):
         self.assertIn("error", result2.lower())
         self.assertIn("email", result2.lower())
 
+        # Email comparison ignores case
+        result3 = register_user("Test@Example.COM", "Shouting User")
+        self.assertIn("email", result3.lower())
+
+        # Should reject a malformed email
+        result3 = register_user("not-an-email", "Bad User")
+        self.assertIn("error", result3.lower())
+        self.assertEqual(len(library_db["users"]), 1)
+
     def test_library_service_borrow_book(self):
         """Test book borrowing with business rules and events."""
         # Setup: Add book and user
         add_book_to_library("978-0-123456-78-9", "Borrowable Book", "Author", 1)
         register_user("borrower@example.com", "Borrower User")
 
-        book_id = list(library_db["books"].keys())[0]
-        user_id = list(library_db["users"].keys())[0]
+        book_id = _first(library_db["books"])
+        user_id = _first(library_db["users"])
 
         # Should successfully borrow
         result = borrow_book(user_id, book_id)
@@ -557,7 +1362,7 @@ class TestLibraryService(unittest.TestCase):
 
         # Borrowing should be recorded
         self.assertEqual(len(library_db["borrowings"]), 1)
-        borrowing = list(library_db["borrowings"].values())[0]
+        borrowing = _first(library_db["borrowings"].values())
         self.assertEqual(borrowing["user_id"], user_id)
         self.assertEqual(borrowing["book_id"], book_id)
         self.assertIsNotNone(borrowing["borrowed_date"])
@@ -567,14 +1372,62 @@ class TestLibraryService(unittest.TestCase):
         result2 = borrow_book(user_id, book_id)
         self.assertIn("not available", result2.lower())
 
+    def test_library_service_user_borrowings(self):
+        """Test a user's open borrowings follow borrows and returns."""
+        add_book_to_library("978-0-000000-00-1", "First", "Author", 2)
+        add_book_to_library("978-0-000000-00-2", "Second", "Author", 1)
+        register_user("reader@example.com", "Reader")
+        first, second = library_db["books"]
+        user_id = _first(library_db["users"])
+
+        borrow_book(user_id, first)
+        borrow_book(user_id, second)
+        # The same book can't be borrowed twice at once, even with copies left
+        self.assertIn("already", borrow_book(user_id, first).lower())
+
+        return_book(user_id, first)
+        borrowings = get_user_borrowings(user_id)
+        self.assertEqual(len(borrowings), 1)
+        self.assertEqual(borrowings[0]["book_id"], second)
+        self.assertEqual(get_user_borrowings("unknown-user"), [])
+
+        # Failed lookups don't leave empty entries in the index
+        borrow_book("unknown-user", first)
+        return_book("unknown-user", first)
+        self.assertNotIn("unknown-user", library_db["borrowings_by_user"])
+
+        # A loan whose book has left the catalog is reported, not raised
+        del library_db["books"][second]
+        self.assertIn("not found", return_book(user_id, second).lower())
+
+    def test_library_service_suspend_user(self):
+        """Test suspension blocks borrowing and reaches the other services via an event."""
+        add_book_to_library("978-0-123456-78-9", "Blocked Book", "Author", 1)
+        register_user("suspended@example.com", "Suspended User")
+        book_id = _first(library_db["books"])
+        user_id = _first(library_db["users"])
+
+        self.assertIn("suspended", suspend_user(user_id, "Overdue books").lower())
+        self.assertEqual(library_db["users"][user_id]["status"], "suspended")
+        self.assertIn("not active", suspend_user(user_id, "Again").lower())
+        self.assertIn("not found", suspend_user("unknown-user", "Reason").lower())
+        self.assertIn("not active", borrow_book(user_id, book_id).lower())
+
+        process_events()
+        notices = get_user_notifications_by_type(user_id, "account_suspended")
+        self.assertEqual(len(notices), 1)
+        self.assertIn("Overdue books", notices[0]["message"])
+        state = reconstruct_state_from_events(date.today().isoformat())
+        self.assertEqual(state["users"][user_id]["status"], "suspended")
+
     def test_library_service_return_book(self):
         """Test book return with late fee calculation and events."""
         # Setup: Add book, user, and borrow
         add_book_to_library("978-0-123456-78-9", "Returnable Book", "Author", 1)
         register_user("returner@example.com", "Returner User")
 
-        book_id = list(library_db["books"].keys())[0]
-        user_id = list(library_db["users"].keys())[0]
+        book_id = _first(library_db["books"])
+        user_id = _first(library_db["users"])
 
         borrow_book(user_id, book_id)
 
@@ -588,7 +1441,7 @@ class TestLibraryService(unittest.TestCase):
         self.assertEqual(book["available_copies"], 1)
 
         # Borrowing should be marked as returned
-        borrowing = list(library_db["borrowings"].values())[0]
+        borrowing = _first(library_db["borrowings"].values())
         self.assertIsNotNone(borrowing["returned_date"])
 
         # Should not be able to return non-borrowed book
@@ -603,8 +1456,7 @@ class TestNotificationService(unittest.TestCase):
 
     def setUp(self):
         """Set up clean state before each test."""
-        clear_all_system_state()
-        initialize_event_driven_system()
+        reset_event_driven_system()
 
     def test_notification_service_user_registered(self):
         """Test welcome notification on user registration."""
@@ -643,6 +1495,22 @@ class TestNotificationService(unittest.TestCase):
         self.assertIn("Borrowed Book", notifications[0]["message"])
         self.assertEqual(notifications[0]["type"], "borrow_confirmation")
 
+        # Due dates emitted as nanoseconds are shown as ISO dates
+        due_ns = time.time_ns() + LOAN_PERIOD_NS
+        handle_book_borrowed(dict(payload, due_date=due_ns))
+        self.assertIn(_fmt_ts(due_ns), get_user_notifications("user-123")[1]["message"])
+
+    def test_notification_service_notifications_by_type(self):
+        """Test a user's notifications can be fetched by type."""
+        handle_user_registered({"user_id": "user-123", "email": "a@example.com", "name": "A"})
+        handle_book_borrowed({"user_id": "user-123", "book_id": "book-456",
+                              "book_title": "Borrowed Book", "due_date": "2024-02-01T00:00:00"})
+
+        confirmations = get_user_notifications_by_type("user-123", "borrow_confirmation")
+        self.assertEqual(len(confirmations), 1)
+        self.assertIn("Borrowed Book", confirmations[0]["message"])
+        self.assertEqual(get_user_notifications_by_type("user-123", "late_fee"), [])
+
 
 class TestAnalyticsService(unittest.TestCase):
     """
@@ -651,8 +1519,7 @@ class TestAnalyticsService(unittest.TestCase):
 
     def setUp(self):
         """Set up clean state before each test."""
-        clear_all_system_state()
-        initialize_event_driven_system()
+        reset_event_driven_system()
 
     def test_analytics_service_book_borrowed(self):
         """Test borrowing analytics tracking."""
@@ -672,6 +1539,21 @@ class TestAnalyticsService(unittest.TestCase):
         self.assertIn("total_borrows", metrics)
         self.assertEqual(metrics["total_borrows"], 1)
 
+    def test_analytics_service_malformed_event_in_batch(self):
+        """Test a malformed borrow doesn't duplicate or drop the good one batched with it."""
+        emit_event("BookBorrowed", {"user_id": "user-123", "book_id": "book-456",
+                                    "borrowed_date": "2024-01-15T10:00:00"})
+        emit_event("BookBorrowed", {"user_id": "user-123"})  # no book_id
+        process_events()
+
+        borrows = [e for e in analytics_db["events"] if e["type"] == "book_borrowed"]
+        self.assertEqual(len(borrows), 1)
+        self.assertEqual(analytics_db["metrics"]["total_borrows"], 1)
+        self.assertEqual(get_book_popularity_metrics(), [("book-456", 1)])
+        analytics_failures = [f for f in get_failed_events() if f["service"] == "AnalyticsService"]
+        self.assertEqual([f["original_event"]["payload"] for f in analytics_failures],
+                         [{"user_id": "user-123"}])
+
     def test_analytics_service_report_generation(self):
         """Test usage report generation."""
         # Add some test events
@@ -690,6 +1572,37 @@ class TestAnalyticsService(unittest.TestCase):
         self.assertEqual(report["total_borrows"], 1)
 
 
+    def test_analytics_service_report_date_range(self):
+        """Test the report only counts events inside its date range."""
+        for timestamp, event_type, user_id in [
+            ("2024-02-01T09:00:00", "book_borrowed", "user-3"),
+            ("2024-01-31T23:00:00", "book_returned", "user-1"),
+            ("2023-12-31T23:59:59", "book_borrowed", "user-2"),
+            ("2024-01-10T10:00:00", "book_borrowed", "user-1"),
+        ]:
+            analytics_db["events"].append({
+                "type": event_type,
+                "timestamp": timestamp,
+                "data": {"user_id": user_id, "book_id": "book-456"}
+            })
+
+        report = generate_usage_report("2024-01-01", "2024-01-31")
+        self.assertEqual(report["total_borrows"], 1)
+        self.assertEqual(report["total_returns"], 1)
+        self.assertEqual(report["active_users"], 1)
+        self.assertEqual(report["popular_books"], [("book-456", 1)])
+
+        # Bounds with a time of day are honoured to the second
+        report = generate_usage_report("2024-01-31T12:00:00", "2024-02-01T12:00:00")
+        self.assertEqual(report["total_borrows"], 1)
+        self.assertEqual(report["total_returns"], 1)
+
+        # ISO datetimes may use a space instead of "T"
+        report = generate_usage_report("2024-01-31 12:00:00", "2024-02-01 10:00:00")
+        self.assertEqual(report["total_borrows"], 1)
+        self.assertEqual(report["total_returns"], 1)
+
+
 class TestAuditService(unittest.TestCase):
     """
     Tests for the Audit Service - event sourcing and compliance.
@@ -697,8 +1610,7 @@ class TestAuditService(unittest.TestCase):
 
     def setUp(self):
         """Set up clean state before each test."""
-        clear_all_system_state()
-        initialize_event_driven_system()
+        reset_event_driven_system()
 
     def test_audit_service_event_logging(self):
         """Test universal event logging for audit purposes."""
@@ -714,6 +1626,94 @@ class TestAuditService(unittest.TestCase):
         self.assertEqual(audit_event["payload"]["user_id"], "user-123")
         self.assertIn("timestamp", audit_event)
 
+    def test_audit_service_malformed_event_in_batch(self):
+        """Test a malformed event doesn't duplicate or drop the rest of its batch."""
+        emit_event("BookAdded", {"book_id": "book-1"})
+        emit_event("UserSuspended", ["not", "a", "dict"])
+        process_events()
+
+        self.assertEqual([e.event_type for e in audit_db["events"]], ["BookAdded"])
+        self.assertEqual(len(get_audit_trail("book", "book-1")), 1)
+        audit_failures = [f for f in get_failed_events() if f["service"] == "AuditService"]
+        self.assertEqual([f["original_event"]["type"] for f in audit_failures], ["UserSuspended"])
+
+    def test_audit_service_anomaly_detection(self):
+        """Test users borrowing unusually often are flagged."""
+        now = time.time_ns()
+        for n in range(ANOMALY_BORROW_LIMIT + 1):
+            handle_any_event_for_audit("BookBorrowed", {"user_id": "busy", "book_id": n},
+                                       {"timestamp": now, "correlation_id": n})
+        for n in range(ANOMALY_BORROW_LIMIT + 1):
+            # Borrows outside the window don't count
+            handle_any_event_for_audit("BookBorrowed", {"user_id": "old", "book_id": n},
+                                       {"timestamp": "2024-01-15T10:00:00", "correlation_id": n})
+        handle_any_event_for_audit("BookBorrowed", {"user_id": "calm", "book_id": 1},
+                                   {"timestamp": now, "correlation_id": 1})
+
+        anomalies = detect_anomalies()
+        self.assertEqual([a["user_id"] for a in anomalies], ["busy"])
+        self.assertEqual(anomalies[0]["count"], ANOMALY_BORROW_LIMIT + 1)
+
+    def test_audit_service_snapshot_creation(self):
+        """Test a snapshot is unaffected by later changes."""
+        add_book_to_library("978-0-123456-78-9", "Snapshot Book", "Author", 1)
+        register_user("snap@example.com", "Snap User")
+        process_events()
+        book_id = _first(library_db["books"])
+        user_id = _first(library_db["users"])
+
+        snapshot_id = create_system_snapshot()
+        borrow_book(user_id, book_id)
+        process_events()
+
+        snapshot = audit_db["snapshots"][snapshot_id]
+        self.assertEqual(snapshot["library"]["books"][book_id]["available_copies"], 1)
+        self.assertEqual(snapshot["library"]["borrowings"], {})
+        self.assertEqual(snapshot["notification_counts"][user_id], 1)
+        self.assertLess(snapshot["audit_events"], len(audit_db["events"]))
+
+    def test_audit_service_state_reconstruction(self):
+        """Test replaying the audit log up to a date rebuilds the library state."""
+        for event_type, payload, timestamp in [
+            ("BookAdded", {"book_id": 1, "isbn": "978-0-123456-78-9", "title": "Replay",
+                           "author": "Author", "copies": 2}, "2024-01-10T09:00:00"),
+            ("UserRegistered", {"user_id": 2, "email": "r@example.com", "name": "R"},
+             "2024-01-10T10:00:00"),
+            ("BookBorrowed", {"user_id": 2, "book_id": 1}, "2024-01-12T10:00:00"),
+            ("BookReturned", {"user_id": 2, "book_id": 1}, "2024-01-20T10:00:00"),
+        ]:
+            handle_any_event_for_audit(event_type, payload,
+                                       {"timestamp": timestamp, "correlation_id": None})
+
+        state = reconstruct_state_from_events("2024-01-15")
+        self.assertEqual(state["books"][1]["available_copies"], 1)
+        self.assertEqual(state["users"][2]["status"], "active")
+        self.assertIn((2, 1), state["borrowings"])
+
+        state = reconstruct_state_from_events("2024-01-20")
+        self.assertEqual(state["books"][1]["available_copies"], 2)
+        self.assertEqual(state["borrowings"], {})
+
+        # A time of day (with either separator) is an exact cut-off
+        state = reconstruct_state_from_events("2024-01-20 09:00:00")
+        self.assertIn((2, 1), state["borrowings"])
+
+    def test_audit_service_export(self):
+        """Test the audit log exports as one JSON document per event."""
+        handle_any_event_for_audit("UserRegistered", {"user_id": "user-123"},
+                                   {"timestamp": "2024-01-15T10:00:00", "correlation_id": "corr-1"})
+
+        exported = export_audit_log()
+        self.assertEqual(len(exported), 1)
+        self.assertEqual(json.loads(exported[0])["payload"], {"user_id": "user-123"})
+
+        # Values JSON can't represent are named in the error
+        handle_any_event_for_audit("UserRegistered",
+                                   {"user_id": "user-456", "at": datetime(2024, 1, 15)},
+                                   {"timestamp": "2024-01-15T10:00:00", "correlation_id": "corr-2"})
+        with self.assertRaisesRegex(TypeError, "datetime"):
+            export_audit_log()
+
     def test_audit_service_audit_trail(self):
         """Test audit trail retrieval for specific entities."""
         # Add multiple events for a user
@@ -739,8 +1739,7 @@ class TestEventDrivenArchitecture(unittest.TestCase):
 
     def setUp(self):
         """Set up clean state before each test."""
-        clear_all_system_state()
-        initialize_event_driven_system()
+        reset_event_driven_system()
 
     def test_system_initialization(self):
         """Test that all event handlers are properly registered."""
@@ -755,6 +1754,29 @@ class TestEventDrivenArchitecture(unittest.TestCase):
             self.assertIn(event_type, event_handlers)
             self.assertGreater(len(event_handlers[event_type]), 0)
 
+    def test_reset_event_driven_system(self):
+        """Test reset clears all data but leaves the standard handlers registered."""
+        register_user("john@example.com", "John Doe")
+        process_events()
+        register_event_handler("CustomEvent", lambda payload: None, "TestService")
+        self.assertEqual(len(library_db["users"]), 1)
+        self.assertEqual(len(audit_db["events"]), 1)
+
+        reset_event_driven_system()
+
+        self.assertEqual(len(library_db["users"]), 0)
+        self.assertEqual(len(audit_db["events"]), 0)
+        self.assertNotIn("CustomEvent", event_handlers)
+        self.assertIn("UserRegistered", event_handlers)
+        self.assertIn(ALL_EVENTS, bulk_handlers)
+
+    def test_system_initialization_is_idempotent(self):
+        """Test initializing twice doesn't register handlers twice."""
+        before = {event_type: len(handlers) for event_type, handlers in event_handlers.items()}
+        initialize_event_driven_system()
+        after = {event_type: len(handlers) for event_type, handlers in event_handlers.items()}
+        self.assertEqual(after, before)
+
     def test_end_to_end_workflow(self):
         """Test complete workflow across all services."""
         # 1. Register user (should trigger notifications and analytics)
@@ -768,7 +1790,7 @@ class TestEventDrivenArchitecture(unittest.TestCase):
         process_events()
 
         # 4. Verify notifications were sent
-        user_id = list(library_db["users"].keys())[0]
+        user_id = _first(library_db["users"])
         notifications = get_user_notifications(user_id)
         self.assertGreater(len(notifications), 0)
 
@@ -787,33 +1809,62 @@ class TestEventDrivenArchitecture(unittest.TestCase):
         # events independently and the system works through
         # the message broker only
 
+    def test_clear_all_system_state_keeps_tables(self):
+        """Test that a reset empties the existing tables instead of replacing them."""
+        register_user("reset@example.com", "Reset User")
+        process_events()
+        tables = [table for db in (library_db, notification_db, analytics_db, audit_db)
+                  for table in db.values()]
+
+        clear_all_system_state()
+
+        after = [table for db in (library_db, notification_db, analytics_db, audit_db)
+                 for table in db.values()]
+        self.assertEqual(len(after), len(tables))
+        for before_table, after_table in zip(tables, after):
+            self.assertIs(before_table, after_table)
+            self.assertEqual(len(after_table), 0)
+        self.assertEqual(len(event_queue), 0)
+        self.assertEqual(len(event_handlers), 0)
+
+
+# QUIET=1 trims run_tests() and the banner below down to the pass/fail summary
+QUIET = os.environ.get("QUIET") == "1"
+
 
 def run_tests():
     """
     Run all tests and provide detailed feedback for event-driven architecture.
+
+    Set QUIET=1 to send the per-test output to an in-memory buffer and only
+    print the pass/fail summary (useful when stdout is piped, e.g. in CI).
     """
-    print("🧪 Running Test Suite for Event-Driven Architecture Library System")
-    print("=" * 75)
-    print()
-    print("This tests verify proper event-driven architecture implementation:")
-    print("📡 MESSAGE BROKER: Event routing and delivery infrastructure")
-    print("📚 LIBRARY SERVICE: Core domain operations with event emission")
-    print("🔔 NOTIFICATION SERVICE: User communications through event handling")
-    print("📊 ANALYTICS SERVICE: Usage tracking through event processing")
-    print("📋 AUDIT SERVICE: Event sourcing and compliance logging")
-    print("🏗️  ARCHITECTURE TESTS: Service isolation and event flow")
-    print()
+    if not QUIET:
+        print("🧪 Running Test Suite for Event-Driven Architecture Library System")
+        print("=" * 75)
+        print()
+        print("This tests verify proper event-driven architecture implementation:")
+        print("📡 MESSAGE BROKER: Event routing and delivery infrastructure")
+        print("📚 LIBRARY SERVICE: Core domain operations with event emission")
+        print("🔔 NOTIFICATION SERVICE: User communications through event handling")
+        print("📊 ANALYTICS SERVICE: Usage tracking through event processing")
+        print("📋 AUDIT SERVICE: Event sourcing and compliance logging")
+        print("🏗️  ARCHITECTURE TESTS: Service isolation and event flow")
+        print()
 
     # Run tests with detailed output
     test_loader = unittest.TestLoader()
     test_suite = test_loader.loadTestsFromModule(sys.modules[__name__])
 
-    runner = unittest.TextTestRunner(verbosity=2, stream=sys.stdout)
+    stream = io.StringIO() if QUIET else sys.stdout
+    runner = unittest.TextTestRunner(verbosity=2, stream=stream)
     result = runner.run(test_suite)
 
     print("\n" + "=" * 75)
     if result.wasSuccessful():
         print("🎉 Congratulations! All tests pass!")
+        if QUIET:
+            return True
         print("Your event-driven architecture implementation is complete!")
         print()
         print("🏗️  Event-Driven Architecture Characteristics Demonstrated:")
@@ -824,6 +1875,9 @@ def run_tests():
         print("✅ Eventually consistent distributed state")
         print("✅ Service isolation and independence")
     else:
+        if QUIET:
+            # The failure details are still needed, so flush the captured report
+            sys.stdout.write(stream.getvalue())
         print(f"❌ {len(result.failures)} test(s) failed, {len(result.errors)} error(s)")
         print()
         print("💡 Tips for event-driven architecture success:")
@@ -839,22 +1893,23 @@ def run_tests():
 
 
 if __name__ == "__main__":
-    print("🎯 Event-Driven Architecture - Advanced Test-Driven Development Exercise")
-    print()
-    print("🏗️  System Architecture:")
-    print("📡 Message Broker: Event routing and delivery")
-    print("📚 Library Service: Books, users, borrowings")
-    print("🔔 Notification Service: User communications")
-    print("📊 Analytics Service: Usage tracking and insights")
-    print("📋 Audit Service: Event sourcing and compliance")
-    print()
-    print("🎓 Advanced Concepts:")
-    print("• Event sourcing and state reconstruction")
-    print("• Eventually consistent distributed systems")
-    print("• Fault-tolerant event processing")
-    print("• Service isolation and loose coupling")
-    print("• Correlation IDs and event tracing")
-    print()
+    if not QUIET:
+        print("🎯 Event-Driven Architecture - Advanced Test-Driven Development Exercise")
+        print()
+        print("🏗️  System Architecture:")
+        print("📡 Message Broker: Event routing and delivery")
+        print("📚 Library Service: Books, users, borrowings")
+        print("🔔 Notification Service: User communications")
+        print("📊 Analytics Service: Usage tracking and insights")
+        print("📋 Audit Service: Event sourcing and compliance")
+        print()
+        print("🎓 Advanced Concepts:")
+        print("• Event sourcing and state reconstruction")
+        print("• Eventually consistent distributed systems")
+        print("• Fault-tolerant event processing")
+        print("• Service isolation and loose coupling")
+        print("• Correlation IDs and event tracing")
+        print()
 
     # Run the tests
     success = run_tests()